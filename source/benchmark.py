@@ -0,0 +1,172 @@
+"""Benchmark suite measuring time of solvers on synthetic instances of growing size, with history of runs
+
+Every run appends one JSON line per case to the history file, which can be loaded with pandas.read_json(path, lines=True)
+e.g. to plot time versus number of customers for every solver. Runs are compared with a baseline run of the same history."""
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import subprocess
+import uuid
+from timeit import default_timer as timer
+import numpy
+from city import Cities
+from generator import DISTRIBUTIONS, generate_instance
+import solver as solver_module
+from testset_parser import TestData
+
+MAX_RANGE = 10 ** 9
+NUMBER_OF_ITERATIONS = 5
+MAX_NUMBER_OF_ANTS = 20
+ALPHA = 1
+BETA = 7
+EVAPORATE_FACTOR = 0.4
+PHEROMONES_FACTOR = 20
+CANDIDATE_LIST_SIZE = 10
+SIZES = [50, 100, 200, 500, 1000, 2000, 5000]
+STORAGES = ['dense', 'sparse']
+MAX_DENSE_SIZE = 2000
+MIN_SPARSE_SIZE = 1000
+SOLVERS = ['HeuristicSolver', 'SavingsSolver', 'SweepSolver', 'ACOSolver', 'ElitistACOSolver', 'MMASSolver', 'EnhancedACOSolver']
+HISTORY_PATH = 'benchmark_history.jsonl'
+REGRESSION_THRESHOLD = 1.2
+MIN_COMPARED_TIME = 5.0
+COMPARED_TIMES = {'distances_time': 'distances', 'candidates_time': 'candidates', 'setup_time': 'setup', 'time': 'solve'}
+
+def get_storages(size: int, storages: list[str] = None) -> list[str]:
+    """Returns storages of distances and pheromones benchmarked for the size, if they are not given: dense matrices
+    up to MAX_DENSE_SIZE cities and sparse storage from MIN_SPARSE_SIZE cities, so both are compared in between"""
+    if storages is not None:
+        return storages
+    return [storage for storage, used in (('dense', size <= MAX_DENSE_SIZE), ('sparse', size >= MIN_SPARSE_SIZE)) if used]
+
+def get_parameters(solver_name: str, test_data: TestData, engine: str, storage: str = 'dense') -> dict:
+    """Returns parameters used for the solver, ACO solvers run a few iterations with nearest customers as candidates"""
+    parameters = {'engine': engine, 'candidate_list_size': CANDIDATE_LIST_SIZE, 'sparse': storage == 'sparse'}
+    if not issubclass(getattr(solver_module, solver_name), solver_module.ACOSolver):
+        return parameters
+    parameters.update(number_of_ants=min(len(test_data.cities), MAX_NUMBER_OF_ANTS), alpha=ALPHA, beta=BETA,
+                      pheromones_factor=PHEROMONES_FACTOR, evaporate_factor=EVAPORATE_FACTOR, number_of_iterations=NUMBER_OF_ITERATIONS)
+    if solver_name == 'ElitistACOSolver':
+        parameters['number_of_elitist_ants'] = max(1, parameters['number_of_ants'] // 6)
+    return parameters
+
+def run_case(solver_name: str, test_data: TestData, engine: str, seed: int, storage: str = 'dense') -> dict:
+    """Solves the instance and returns times in milliseconds: of distances, of candidate lists, of the rest of setup
+    (e.g. heuristic information) and of solving, together with length of the route found
+
+    Times come from a solver without instrumentation, so they do not include overhead of measuring phases.
+    Time of every phase and counters are collected by a second, instrumented solve with the same seed."""
+    cities = Cities(test_data.cities.positions, test_data.cities.demands)
+    solver_class = getattr(solver_module, solver_name)
+    parameters = get_parameters(solver_name, test_data, engine, storage)
+    start = timer()
+    solver = solver_class(cities, test_data.capacity, MAX_RANGE, 2 * test_data.truck_count, seed, **parameters)
+    setup_time = (timer() - start) * 1000
+    solver.solve()
+    instrumented_solver = solver_class(cities, test_data.capacity, MAX_RANGE, 2 * test_data.truck_count, seed,
+                                       instrumentation=True, **parameters)
+    instrumented_solver.solve()
+    statistics = instrumented_solver.get_statistics()
+    return {'solver': solver_name, 'engine': engine, 'storage': storage, 'distances_time': solver.setup_times['distances'],
+            'candidates_time': solver.setup_times['candidates'], 'setup_time': setup_time - sum(solver.setup_times.values()),
+            'time': solver.solve_time, 'phases': statistics['times'], 'counters': statistics['counters'],
+            'route_length': float(solver.route_length) if solver.result else None}
+
+def run_benchmark(sizes: list[int], distributions: list[str], solvers: list[str], engines: list[str], seeds: list[int],
+                  tightness: float, history_path: str, storages: list[str] = None) -> str:
+    """Runs all cases, appends them to the history and returns identifier of the run (see get_storages for default storages)"""
+    run = {'run': uuid.uuid4().hex[:12], 'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+           'commit': _get_commit(), 'machine': platform.node(), 'python': platform.python_version(), 'numpy': numpy.__version__}
+    for size in sizes:
+        for distribution in distributions:
+            for seed in seeds:
+                test_data = generate_instance(size, seed, distribution, tightness)
+                for solver_name in solvers:
+                    for engine in engines:
+                        for storage in get_storages(size, storages):
+                            record = {**run, 'size': size, 'distribution': distribution, 'tightness': tightness, 'seed': seed,
+                                      **run_case(solver_name, test_data, engine, seed, storage)}
+                            with open(history_path, 'a', encoding='utf-8') as file:
+                                file.write(json.dumps(record) + '\n')
+                            print(F'{solver_name} engine={engine} storage={storage} n={size} {distribution} seed={seed}: '
+                                  F'distances {record["distances_time"]:.1f} ms, candidates {record["candidates_time"]:.1f} ms, '
+                                  F'setup {record["setup_time"]:.1f} ms, solve {record["time"]:.1f} ms, length {record["route_length"]}')
+    return run['run']
+
+def load_history(history_path: str) -> list[dict]:
+    """Returns all records stored in the history"""
+    if not os.path.isfile(history_path):
+        return []
+    with open(history_path, 'r', encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def compare_runs(history_path: str, run: str = None, baseline: str = None, threshold: float = REGRESSION_THRESHOLD) -> list[str]:
+    """Compares mean times of cases of the run (the last one by default) with the baseline run (the one before by default)
+    and returns descriptions of cases which are slower by more than threshold times
+
+    Times shorter than MIN_COMPARED_TIME milliseconds are too noisy to be compared and are never reported as regressions."""
+    records = load_history(history_path)
+    runs = list(dict.fromkeys(record['run'] for record in records))
+    run = run if run is not None else (runs[-1] if runs else None)
+    baseline = baseline if baseline is not None else (runs[runs.index(run) - 1] if run in runs and runs.index(run) > 0 else None)
+    if run is None or baseline is None:
+        print('No baseline run to compare with')
+        return []
+    (times, baseline_times) = (_get_mean_times(records, run), _get_mean_times(records, baseline))
+    regressions = []
+    for case, case_times in times.items():
+        if case not in baseline_times:
+            continue
+        ratios = [time / baseline_time if baseline_time > MIN_COMPARED_TIME else 1.0
+                  for time, baseline_time in zip(case_times, baseline_times[case])]
+        description = F'{" ".join(str(value) for value in case)}: ' + ', '.join(F'{name} x{ratio:.2f}' for name, ratio in zip(COMPARED_TIMES.values(), ratios))
+        print(description)
+        if max(ratios) > threshold:
+            regressions.append(description)
+    print(F'Run {run} compared with {baseline}: {len(regressions)} regressions above x{threshold}')
+    return regressions
+
+def _get_mean_times(records: list[dict], run: str) -> dict[tuple, tuple[float, ...]]:
+    cases = {}
+    for record in records:
+        if record['run'] == run:
+            # Records written before storages were benchmarked used dense matrices
+            case = (record['solver'], record['engine'], record.get('storage', 'dense'), record['distribution'], record['size'],
+                    record['tightness'])
+            # Records written before distances and candidates were timed separately miss their times
+            cases.setdefault(case, []).append(tuple(record.get(name, 0.0) for name in COMPARED_TIMES))
+    return {case: tuple(numpy.mean(times, axis=0).tolist()) for case, times in cases.items()}
+
+def _get_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> None:
+    """Runs the benchmark suite and compares it with the baseline run"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS), choices=DISTRIBUTIONS)
+    parser.add_argument('--solvers', nargs='+', default=SOLVERS)
+    parser.add_argument('--engines', nargs='+', default=list(solver_module.ENGINES), choices=solver_module.ENGINES)
+    parser.add_argument('--storages', nargs='+', choices=STORAGES,
+                        help=F'storages of distances and pheromones, by default dense up to {MAX_DENSE_SIZE} and sparse from {MIN_SPARSE_SIZE} cities')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[11174])
+    parser.add_argument('--tightness', type=float, default=0.9)
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--baseline', help='identifier of the baseline run, the previous run by default')
+    parser.add_argument('--compare-only', action='store_true', help='compare the last run with the baseline without running')
+    arguments = parser.parse_args()
+
+    run = None
+    if not arguments.compare_only:
+        run = run_benchmark(arguments.sizes, arguments.distributions, arguments.solvers, arguments.engines, arguments.seeds,
+                            arguments.tightness, arguments.history, arguments.storages)
+    compare_runs(arguments.history, run, arguments.baseline)
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,39 @@
-"""Implementation for the class representing City"""
+"""Implementation for the classes representing City and collection of Cities"""
 import math
+import numpy
 
 class City:
-    """Class representing a single city with its position and demand"""
+    """Class representing a single city with its position and demand
+
+    City is a view of a single row of Cities arrays, a standalone city owns one-element Cities."""
+    __slots__ = ('_cities', '_index')
+
     def __init__(self, x_pos: float, y_pos: float, demand: float) -> None:
-        self.x_pos = x_pos
-        self.y_pos = y_pos
-        self.demand = demand
+        self._cities = Cities(numpy.array([[x_pos, y_pos]]), numpy.array([demand]))
+        self._index = 0
+
+    @classmethod
+    def view(cls, cities: "Cities", index: int) -> "City":
+        """Returns city backed by index-th row of cities arrays"""
+        city = cls.__new__(cls)
+        city._cities = cities
+        city._index = index
+        return city
+
+    @property
+    def x_pos(self) -> float:
+        """Horizontal position of the city"""
+        return self._cities.positions[self._index, 0].item()
+
+    @property
+    def y_pos(self) -> float:
+        """Vertical position of the city"""
+        return self._cities.positions[self._index, 1].item()
+
+    @property
+    def demand(self) -> float:
+        """Demand of the city"""
+        return self._cities.demands[self._index].item()
 
     def __str__(self) -> str:
         return F"Pos = ({self.x_pos},{self.y_pos}), demand = {self.demand}"
@@ -16,3 +43,90 @@ class City:
         d_x = self.x_pos - other.x_pos
         d_y = self.y_pos - other.y_pos
         return math.hypot(d_x, d_y)
+
+class Cities:
+    """Class storing positions and demands of all cities (depot being the first one) in numpy arrays
+
+    Distances matrix is calculated once for every dtype and shared by all solvers using the same Cities.
+    It may also be passed already calculated, positions may be None if distances are given explicitly."""
+    __slots__ = ('positions', 'demands', '_distances', '_explicit')
+
+    def __init__(self, positions: numpy.ndarray, demands: numpy.ndarray, distances: numpy.ndarray = None) -> None:
+        self.demands = numpy.asarray(demands)
+        self._explicit = positions is None
+        if self._explicit and distances is None:
+            raise ValueError('Distances have to be given for cities without positions')
+        self.positions = numpy.full((len(self.demands), 2), numpy.nan) if self._explicit else numpy.asarray(positions)
+        self._distances = {} if distances is None else {distances.dtype: distances}
+
+    @property
+    def is_explicit(self) -> bool:
+        """True if distances were given explicitly instead of positions"""
+        return self._explicit
+
+    @classmethod
+    def from_list(cls, cities: list[City]) -> "Cities":
+        """Creates Cities from a list of separate City objects"""
+        positions = numpy.array([(city.x_pos, city.y_pos) for city in cities]).reshape(len(cities), 2)
+        demands = numpy.array([city.demand for city in cities])
+        return cls(positions, demands)
+
+    def __getstate__(self) -> tuple:
+        distances = next(iter(self._distances.values())) if self._explicit else None
+        return (None if self._explicit else self.positions, self.demands, distances)
+
+    def __setstate__(self, state: tuple) -> None:
+        Cities.__init__(self, *state)
+
+    def __len__(self) -> int:
+        return len(self.demands)
+
+    def __getitem__(self, index: int | slice) -> City | list[City]:
+        if isinstance(index, slice):
+            return [City.view(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('City index out of range')
+        return City.view(self, index)
+
+    def __iter__(self):
+        return (City.view(self, i) for i in range(len(self)))
+
+    def get_distances(self, dtype: numpy.dtype = numpy.float64) -> numpy.ndarray:
+        """Returns matrix of distances between all cities, it must not be modified as it is shared"""
+        dtype = numpy.dtype(dtype)
+        if dtype not in self._distances and len(self._distances) > 0:
+            self._distances[dtype] = next(iter(self._distances.values())).astype(dtype)
+        if dtype not in self._distances:
+            positions = self.positions.astype(dtype)
+            distances = numpy.subtract.outer(positions[:, 0], positions[:, 0])
+            d_y = numpy.subtract.outer(positions[:, 1], positions[:, 1])
+            numpy.hypot(distances, d_y, out=distances)
+            self._distances[dtype] = distances
+        return self._distances[dtype]
+
+class LazyDistances:
+    """Distances between cities calculated from positions when they are read, instead of being stored in a matrix
+
+    Supports indexing used by solvers: single distances, rows, columns, blocks of rows and arrays of pairs of cities."""
+    __slots__ = ('positions', 'dtype')
+
+    def __init__(self, positions: numpy.ndarray, dtype: numpy.dtype = numpy.float64) -> None:
+        self.dtype = numpy.dtype(dtype)
+        self.positions = positions.astype(self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the distances matrix"""
+        return (len(self.positions), len(self.positions))
+
+    def __getitem__(self, index: tuple | int | slice) -> numpy.ndarray:
+        (rows, columns) = index if isinstance(index, tuple) else (index, slice(None))
+        (start, end) = (self.positions[rows], self.positions[columns])
+        if isinstance(rows, slice) and isinstance(columns, slice):
+            (start, end) = (start[:, numpy.newaxis], end[numpy.newaxis])
+        return numpy.hypot(start[..., 0] - end[..., 0], start[..., 1] - end[..., 1])
@@ -0,0 +1,38 @@
+"""Generator of synthetic CVRP instances"""
+import math
+import numpy
+from city import Cities
+from testset_parser import TestData
+
+UNIFORM_DISTRIBUTION = 'uniform'
+CLUSTERED_DISTRIBUTION = 'clustered'
+DISTRIBUTIONS = (UNIFORM_DISTRIBUTION, CLUSTERED_DISTRIBUTION)
+GRID_SIZE = 1000
+CUSTOMERS_PER_CLUSTER = 50
+CLUSTER_DEVIATION = 40
+
+def generate_instance(number_of_customers: int, seed: int, distribution: str = UNIFORM_DISTRIBUTION, tightness: float = 0.9,
+                      customers_per_route: int = 10, max_demand: int = 10) -> TestData:
+    """Generates instance with customers placed on integer points of the grid, either uniformly or in clusters,
+    and the depot in the middle of the grid
+
+    Demands are drawn uniformly from 1 to max_demand. Number of trucks is chosen so that every truck serves
+    customers_per_route customers on average and capacity so that trucks are filled in tightness fraction of their capacity.
+    The same seed always gives the same instance."""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(F'Unknown distribution: {distribution}, expected one of {DISTRIBUTIONS}')
+    generator = numpy.random.default_rng(seed)
+    if distribution == UNIFORM_DISTRIBUTION:
+        positions = generator.uniform(0, GRID_SIZE, (number_of_customers, 2))
+    else:
+        number_of_clusters = max(1, number_of_customers // CUSTOMERS_PER_CLUSTER)
+        centers = generator.uniform(0, GRID_SIZE, (number_of_clusters, 2))
+        clusters = generator.integers(0, number_of_clusters, number_of_customers)
+        positions = generator.normal(centers[clusters], CLUSTER_DEVIATION)
+    positions = numpy.clip(numpy.rint(positions), 0, GRID_SIZE)
+    positions = numpy.vstack(([GRID_SIZE / 2, GRID_SIZE / 2], positions))
+    demands = numpy.concatenate(([0], generator.integers(1, max_demand + 1, number_of_customers)))
+
+    truck_count = math.ceil(number_of_customers / customers_per_route)
+    capacity = max(max_demand, math.ceil(demands.sum() / (truck_count * tightness)))
+    return TestData(truck_count, capacity, Cities(positions, demands), None, [])
@@ -0,0 +1,54 @@
+"""Instrumentation measuring time spent by solvers in phases of solving"""
+from collections import defaultdict
+from functools import wraps
+from timeit import default_timer as timer
+from typing import Any, Callable
+
+class SolverStatistics:
+    """Class collecting time spent in phases of solving, number of calls of each phase and counters
+
+    Phases are measured by wrapping solver methods, so nested phases (e.g. target selection during construction)
+    are included in time of the outer phase as well. Times merged from worker processes are summed over workers."""
+    def __init__(self) -> None:
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def timed(self, phase: str, method: Callable) -> Callable:
+        """Returns method wrapped with measurement of its time as the given phase"""
+        @wraps(method)
+        def timed_method(*args, **kwargs) -> Any:
+            start = timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.times[phase] += timer() - start
+                self.calls[phase] += 1
+        return timed_method
+
+    def clear(self) -> None:
+        """Forgets everything collected so far"""
+        self.times.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def merge(self, times: dict[str, float], calls: dict[str, int]) -> None:
+        """Adds times (in seconds) and calls of phases measured elsewhere, e.g. in worker processes"""
+        for phase, time in times.items():
+            self.times[phase] += time
+        for phase, count in calls.items():
+            self.calls[phase] += count
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """Increases counter by value"""
+        self.counters[counter] += value
+
+    def to_dict(self) -> dict[str, dict[str, float]]:
+        """Returns times (in milliseconds), calls and counters collected so far"""
+        return {'times': {phase: time * 1000 for phase, time in self.times.items()},
+                'calls': dict(self.calls), 'counters': dict(self.counters)}
+
+    def __str__(self) -> str:
+        phases = '\n'.join(F'\t{phase}: {time * 1000:.3f} ms ({self.calls[phase]} calls)' for phase, time in self.times.items())
+        counters = '\n'.join(F'\t{counter}: {value}' for counter, value in self.counters.items())
+        return F'Phases:\n{phases}\nCounters:\n{counters}'
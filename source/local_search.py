@@ -0,0 +1,221 @@
+"""Local search improving routes found for CVRP problem"""
+from collections import deque
+import numpy
+
+EPSILON = 1e-9
+MAX_SEGMENT_LENGTH = 3
+
+class LocalSearch:
+    """Class improving routes with delta evaluated moves, using neighbour lists and don't look bits
+
+    Intra-route moves are 2-opt (reversal of a segment) and Or-opt (moving a segment of up to three customers),
+    inter-route moves are relocation of such segment to other path and exchange of two customers.
+    Moves are only tried between a customer and its neighbours and every applied move keeps capacity and range
+    of all paths within limits. If distances are not symmetric, moves reversing a segment (2-opt and insertion
+    of a reversed segment) are not tried, as their deltas would be wrong."""
+    def __init__(self, distances: numpy.ndarray, demands: numpy.ndarray, max_capacity: int, max_range: int,
+                neighbours: numpy.ndarray, symmetric: bool = True) -> None:
+        self.distances = distances
+        self.symmetric = symmetric
+        self.demands = demands.tolist()
+        self.max_capacity = max_capacity
+        self.max_range = max_range
+        self.neighbours = neighbours.tolist()
+        self._paths = []
+        self._loads = []
+        self._lengths = []
+        self._path_of = [0] * len(distances)
+        self._position_of = [0] * len(distances)
+
+    def set_request(self, demands: numpy.ndarray, max_capacity: int, max_range: int) -> None:
+        """Replaces demands and limits of trucks, used when solver is reset for another request"""
+        self.demands = demands.tolist()
+        self.max_capacity = max_capacity
+        self.max_range = max_range
+
+    def improve(self, route: list[int]) -> tuple[list[int], float]:
+        """Returns locally optimal route, obtained from route passed, and its length"""
+        self._load(route)
+        active = deque(city for city in route if city != 0)
+        is_active = [False] * len(self.distances)
+        for city in active:
+            is_active[city] = True
+        while active:
+            city = active.popleft()
+            is_active[city] = False
+            touched = self._try_two_opt(city) or self._try_or_opt(city) or self._try_exchange(city)
+            if touched:
+                for touched_city in touched:
+                    if touched_city != 0 and not is_active[touched_city]:
+                        is_active[touched_city] = True
+                        active.append(touched_city)
+        return self._store()
+
+    def _load(self, route: list[int]) -> None:
+        self._paths = []
+        # Customers without demand may be missing from the route, they are skipped as neighbours
+        self._path_of = [-1] * len(self.distances)
+        path = []
+        for city in route[1:]:
+            if city != 0:
+                path.append(city)
+            elif len(path) > 0:
+                self._paths.append(path)
+                path = []
+        self._loads = [sum(self.demands[city] for city in path) for path in self._paths]
+        self._lengths = [self._get_path_length(path) for path in self._paths]
+        for path_id in range(len(self._paths)):
+            self._update_positions(path_id)
+
+    def _store(self) -> tuple[list[int], float]:
+        route = [0]
+        for path in self._paths:
+            if len(path) > 0:
+                route.extend(path)
+                route.append(0)
+        length = float(self.distances[route[:-1], route[1:]].sum())
+        return (route, length)
+
+    def _get_path_length(self, path: list[int]) -> float:
+        stops = [0] + path + [0]
+        return float(self.distances[stops[:-1], stops[1:]].sum())
+
+    def _update_positions(self, path_id: int) -> None:
+        for position, city in enumerate(self._paths[path_id]):
+            self._path_of[city] = path_id
+            self._position_of[city] = position
+
+    @staticmethod
+    def _pred(path: list[int], position: int) -> int:
+        return path[position - 1] if position > 0 else 0
+
+    @staticmethod
+    def _succ(path: list[int], position: int) -> int:
+        return path[position + 1] if position + 1 < len(path) else 0
+
+    def _try_two_opt(self, city: int) -> list[int]:
+        if not self.symmetric:
+            return []
+        distance = self.distances
+        path_id = self._path_of[city]
+        path = self._paths[path_id]
+        i = self._position_of[city]
+        (pred, succ) = (self._pred(path, i), self._succ(path, i))
+        for other in self.neighbours[city]:
+            if self._path_of[other] != path_id or other == city:
+                continue
+            j = self._position_of[other]
+            if i < j:
+                other_succ = self._succ(path, j)
+                delta = distance[city, other] + distance[succ, other_succ] - distance[city, succ] - distance[other, other_succ]
+                if delta < -EPSILON:
+                    path[i + 1:j + 1] = path[i + 1:j + 1][::-1]
+                    self._lengths[path_id] += delta
+                    self._update_positions(path_id)
+                    return [city, other, succ, other_succ]
+            else:
+                other_pred = self._pred(path, j)
+                delta = distance[other_pred, pred] + distance[other, city] - distance[other_pred, other] - distance[pred, city]
+                if delta < -EPSILON:
+                    path[j:i] = path[j:i][::-1]
+                    self._lengths[path_id] += delta
+                    self._update_positions(path_id)
+                    return [city, other, pred, other_pred]
+        return []
+
+    def _try_or_opt(self, city: int) -> list[int]:
+        distance = self.distances
+        path_id = self._path_of[city]
+        path = self._paths[path_id]
+        i = self._position_of[city]
+        for segment_length in range(1, MAX_SEGMENT_LENGTH + 1):
+            if i + segment_length > len(path):
+                break
+            segment = path[i:i + segment_length]
+            last = segment[-1]
+            (pred, succ) = (self._pred(path, i), self._succ(path, i + segment_length - 1))
+            removal = distance[pred, succ] - distance[pred, city] - distance[last, succ]
+            # Edges inside the segment move with it to the other path
+            segment_internal = sum(distance[segment[k], segment[k + 1]] for k in range(segment_length - 1))
+            segment_demand = sum(self.demands[stop] for stop in segment)
+            for other in self.neighbours[city]:
+                if other in segment or self._path_of[other] < 0:
+                    continue
+                other_path_id = self._path_of[other]
+                other_path = self._paths[other_path_id]
+                same_path = other_path_id == path_id
+                if not same_path and (self._loads[other_path_id] + segment_demand > self.max_capacity
+                                      or self._lengths[path_id] + removal - segment_internal > self.max_range):
+                    continue
+                j = self._position_of[other]
+                for after in ((True, False) if self.symmetric else (True,)):
+                    neighbour = self._succ(other_path, j) if after else self._pred(other_path, j)
+                    if same_path and neighbour in segment:
+                        continue
+                    (start, end) = (other, neighbour) if after else (neighbour, other)
+                    (head, tail) = (city, last) if after else (last, city)
+                    insertion = distance[start, head] + distance[tail, end] - distance[start, end]
+                    if removal + insertion >= -EPSILON:
+                        continue
+                    if same_path and self._lengths[path_id] + removal + insertion > self.max_range:
+                        continue
+                    if not same_path and self._lengths[other_path_id] + insertion + segment_internal > self.max_range:
+                        continue
+                    self._move_segment(path_id, i, segment_length, other_path_id, other, after)
+                    if same_path:
+                        self._lengths[path_id] += removal + insertion
+                    else:
+                        self._lengths[path_id] += removal - segment_internal
+                        self._lengths[other_path_id] += insertion + segment_internal
+                        self._loads[path_id] -= segment_demand
+                        self._loads[other_path_id] += segment_demand
+                    return [city, last, pred, succ, other, neighbour]
+        return []
+
+    def _move_segment(self, path_id: int, position: int, segment_length: int, other_path_id: int, other: int, after: bool) -> None:
+        path = self._paths[path_id]
+        segment = path[position:position + segment_length]
+        del path[position:position + segment_length]
+        other_path = self._paths[other_path_id]
+        target = other_path.index(other)
+        if after:
+            other_path[target + 1:target + 1] = segment
+        else:
+            other_path[target:target] = segment[::-1]
+        self._update_positions(path_id)
+        if other_path_id != path_id:
+            self._update_positions(other_path_id)
+
+    def _try_exchange(self, city: int) -> list[int]:
+        distance = self.distances
+        path_id = self._path_of[city]
+        path = self._paths[path_id]
+        i = self._position_of[city]
+        (pred, succ) = (self._pred(path, i), self._succ(path, i))
+        for other in self.neighbours[city]:
+            other_path_id = self._path_of[other]
+            if other_path_id == path_id or other_path_id < 0:
+                continue
+            demand_change = self.demands[other] - self.demands[city]
+            if (self._loads[path_id] + demand_change > self.max_capacity
+                    or self._loads[other_path_id] - demand_change > self.max_capacity):
+                continue
+            other_path = self._paths[other_path_id]
+            j = self._position_of[other]
+            (other_pred, other_succ) = (self._pred(other_path, j), self._succ(other_path, j))
+            delta = distance[pred, other] + distance[other, succ] - distance[pred, city] - distance[city, succ]
+            other_delta = (distance[other_pred, city] + distance[city, other_succ]
+                           - distance[other_pred, other] - distance[other, other_succ])
+            if (delta + other_delta >= -EPSILON
+                    or self._lengths[path_id] + delta > self.max_range
+                    or self._lengths[other_path_id] + other_delta > self.max_range):
+                continue
+            (path[i], other_path[j]) = (other, city)
+            self._lengths[path_id] += delta
+            self._lengths[other_path_id] += other_delta
+            self._loads[path_id] += demand_change
+            self._loads[other_path_id] -= demand_change
+            self._update_positions(path_id)
+            self._update_positions(other_path_id)
+            return [city, other, pred, succ, other_pred, other_succ]
+        return []
@@ -0,0 +1,96 @@
+"""Strategies of pheromones update, deciding which routes reinforce pheromones and how much"""
+from abc import abstractmethod
+import logging
+from typing import TYPE_CHECKING
+import numpy
+
+if TYPE_CHECKING:
+    from solver import ACOSolver, _AntSolution
+
+logger = logging.getLogger(__name__)
+
+class RouteEdges:
+    """Edges of a route stored as arrays of their ends (without depot to depot loops) together with length of the route"""
+    __slots__ = ('cities_from', 'cities_to', 'length')
+
+    def __init__(self, route: list[int], length: float) -> None:
+        route = numpy.asarray(route)
+        not_loop = route[:-1] != route[1:]
+        self.cities_from = route[:-1][not_loop]
+        self.cities_to = route[1:][not_loop]
+        self.length = length
+
+class PheromoneUpdate:
+    """Base class of pheromones update strategies
+
+    If deposit_during_construction is set, every ant lays pheromones on its route as soon as it is built.
+    Routes returned by get_reinforcements are laid after evaporation, every edge gets weight * Q / L.
+    Edges of the best route are calculated once, when the best route changes."""
+    deposit_during_construction = False
+
+    def __init__(self) -> None:
+        self._best_route = None
+        self._best_edges = None
+
+    @abstractmethod
+    def get_reinforcements(self, solver: "ACOSolver") -> list[tuple[RouteEdges, float]]:
+        """Returns edges of routes which reinforce pheromones after evaporation, together with their weights"""
+        raise NotImplementedError('Reinforcements not supported in the base class, use subclass instead')
+
+    def _get_best_edges(self, solver: "ACOSolver") -> RouteEdges:
+        if not solver.result:
+            logger.debug('No solution so far, best route is not reinforced')
+            return None
+        if solver.route is not self._best_route:
+            self._best_route = solver.route
+            self._best_edges = RouteEdges(solver.route, solver.route_length)
+        return self._best_edges
+
+    @staticmethod
+    def _get_ranked_ants(solver: "ACOSolver", count: int) -> list["_AntSolution"]:
+        feasible_ants = [ant for ant in solver.ants if ant.current_route_length > 0]
+        return sorted(feasible_ants, key=lambda ant: ant.current_route_length)[:count]
+
+class AntSystemUpdate(PheromoneUpdate):
+    """Every ant lays pheromones on its route, as in the original Ant System"""
+    deposit_during_construction = True
+
+    def get_reinforcements(self, solver: "ACOSolver") -> list[tuple[RouteEdges, float]]:
+        return []
+
+class ElitistUpdate(AntSystemUpdate):
+    """Every ant lays pheromones on its route and the best route found so far is reinforced by number_of_elitist_ants"""
+    def __init__(self, number_of_elitist_ants: int) -> None:
+        super().__init__()
+        self.number_of_elitist_ants = number_of_elitist_ants
+
+    def get_reinforcements(self, solver: "ACOSolver") -> list[tuple[RouteEdges, float]]:
+        best_edges = self._get_best_edges(solver)
+        return [(best_edges, self.number_of_elitist_ants)] if best_edges is not None else []
+
+class RankBasedUpdate(PheromoneUpdate):
+    """Rank-based Ant System: r-th best ant of the iteration (r < w) lays pheromones with weight w - r
+    and the best route found so far with weight w"""
+    def __init__(self, number_of_ranked_ants: int) -> None:
+        super().__init__()
+        self.number_of_ranked_ants = number_of_ranked_ants
+
+    def get_reinforcements(self, solver: "ACOSolver") -> list[tuple[RouteEdges, float]]:
+        ranked_ants = self._get_ranked_ants(solver, self.number_of_ranked_ants - 1)
+        reinforcements = [(RouteEdges(ant.current_route, ant.current_route_length), self.number_of_ranked_ants - rank)
+                          for rank, ant in enumerate(ranked_ants, 1)]
+        best_edges = self._get_best_edges(solver)
+        if best_edges is not None:
+            reinforcements.append((best_edges, self.number_of_ranked_ants))
+        return reinforcements
+
+class IterationBestUpdate(PheromoneUpdate):
+    """Only the best ant of the iteration lays pheromones"""
+    def get_reinforcements(self, solver: "ACOSolver") -> list[tuple[RouteEdges, float]]:
+        return [(RouteEdges(ant.current_route, ant.current_route_length), 1) for ant in self._get_ranked_ants(solver, 1)]
+
+class GlobalBestUpdate(PheromoneUpdate):
+    """Only the best route found so far is reinforced"""
+    def get_reinforcements(self, solver: "ACOSolver") -> list[tuple[RouteEdges, float]]:
+        best_edges = self._get_best_edges(solver)
+        return [(best_edges, 1)] if best_edges is not None else []
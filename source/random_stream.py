@@ -0,0 +1,41 @@
+"""Stream of random numbers used by solvers"""
+import numpy
+
+RANDOM_BLOCK_SIZE = 1024
+
+class RandomStream:
+    """Class providing uniform random numbers from [0, 1), drawn from numpy Generator in blocks of block_size numbers
+
+    Streams are seeded with SeedSequence, so the same seed always gives the same numbers. Independent streams
+    of the same seed (e.g. for every ant of every iteration) are identified by their spawn key."""
+    __slots__ = ('seed_sequence', 'generator', 'block_size', '_block', '_position')
+
+    def __init__(self, seed: int = None, key: tuple[int, ...] = (), block_size: int = RANDOM_BLOCK_SIZE) -> None:
+        self.block_size = block_size
+        self.seed(seed, key)
+
+    def seed(self, seed: int = None, key: tuple[int, ...] = ()) -> None:
+        """Restarts the stream from the given seed (random entropy if it is None)"""
+        self.seed_sequence = numpy.random.SeedSequence(seed, spawn_key=key)
+        self.generator = numpy.random.Generator(numpy.random.PCG64(self.seed_sequence))
+        self._block = []
+        self._position = 0
+
+    def random(self) -> float:
+        """Returns the next number of the stream"""
+        if self._position == len(self._block):
+            self._block = self.generator.random(self.block_size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def get_state(self) -> dict:
+        """Returns JSON serializable state of the stream, including numbers drawn but not used yet"""
+        return {'generator': self.generator.bit_generator.state, 'block': self._block[self._position:]}
+
+    def set_state(self, state: dict) -> None:
+        """Restores state returned by get_state"""
+        self.generator.bit_generator.state = state['generator']
+        self._block = list(state['block'])
+        self._position = 0
@@ -0,0 +1,105 @@
+"""Results of solvers and sinks writing them to files in different formats"""
+from abc import abstractmethod
+import json
+import os
+from typing import Any
+import numpy
+
+class SolverResult:
+    """Class representing result of a single solver run with the trace of best length found after every iteration"""
+    def __init__(self, algorithm: str, iterations: numpy.ndarray, lengths: numpy.ndarray, time: float,
+                route: list[int], route_length: float, target: float = None, metadata: dict[str, Any] = None) -> None:
+        self.algorithm = algorithm
+        self.iterations = iterations
+        self.lengths = lengths
+        self.time = time
+        self.route = route
+        self.route_length = route_length
+        self.target = target
+        self.metadata = metadata if metadata is not None else {}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns result as a dictionary of JSON serializable values"""
+        return {**self.metadata, 'algorithm': self.algorithm, 'target': self.target, 'time': self.time,
+                'route_length': self.route_length, 'route': [int(city) for city in self.route],
+                'iterations': self.iterations.tolist(), 'lengths': self.lengths.tolist()}
+
+class ResultSink:
+    """Base class for outputs of solver results, results are written once per solver run"""
+    @abstractmethod
+    def write(self, result: SolverResult) -> None:
+        """Writes result of a single run"""
+        raise NotImplementedError('Writing not supported in the base class, use subclass instead')
+
+    def get_keys(self) -> set[str]:
+        """Returns keys (metadata['key']) of results which are already stored"""
+        return set()
+
+    def close(self) -> None:
+        """Flushes buffered results"""
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+class TextSink(ResultSink):
+    """Sink appending results to a text file, one line per iteration"""
+    def __init__(self, path: str, target: float = None) -> None:
+        self.path = path
+        self.target = target
+
+    def write(self, result: SolverResult) -> None:
+        lines = [F'Target: {self.target}'] if self.target is not None else []
+        lines.append(result.algorithm)
+        lines.extend(F'{i} {int(length) if length == 0 else length}' for i, length in zip(result.iterations.tolist(), result.lengths.tolist()))
+        lines.append(F'Time: {result.time} ms')
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+
+class JsonlSink(ResultSink):
+    """Sink appending every result as a single JSON line, the file can be loaded with pandas.read_json(path, lines=True)"""
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def write(self, result: SolverResult) -> None:
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(result.to_dict()) + '\n')
+
+    def get_keys(self) -> set[str]:
+        if not os.path.isfile(self.path):
+            return set()
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return {json.loads(line).get('key') for line in file if line.strip()}
+
+class NpzSink(ResultSink):
+    """Sink storing results in columns of a numpy .npz archive, written when the sink is closed
+
+    Scalar fields and metadata are stored as one column each, traces as a runs x iterations matrix padded with NaN."""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.results = []
+
+    def write(self, result: SolverResult) -> None:
+        self.results.append(result)
+
+    def close(self) -> None:
+        if len(self.results) == 0:
+            return
+        records = [result.to_dict() for result in self.results]
+        columns = {}
+        for name in dict.fromkeys(name for record in records for name in record):
+            if name in ('route', 'iterations', 'lengths'):
+                continue
+            values = [record.get(name) for record in records]
+            columns[name] = numpy.array([numpy.nan if value is None else value for value in values]
+                                        if all(isinstance(value, (int, float)) or value is None for value in values)
+                                        else [str(value) for value in values])
+        width = max(len(result.lengths) for result in self.results)
+        columns['lengths'] = numpy.full((len(self.results), width), numpy.nan)
+        columns['iterations'] = numpy.full((len(self.results), width), -1)
+        for i, result in enumerate(self.results):
+            columns['lengths'][i, :len(result.lengths)] = result.lengths
+            columns['iterations'][i, :len(result.iterations)] = result.iterations
+        numpy.savez(self.path, **columns)
@@ -0,0 +1,75 @@
+"""Cache of evaluated routes, recognising routes which differ only in order and direction of their paths"""
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import NamedTuple
+import numpy
+
+ROUTE_CACHE_SIZE = 4096
+
+class CachedRoute(NamedTuple):
+    """Length of a route (-1 if it is not feasible) together with its locally optimised version and its length"""
+    route_length: float
+    improved_route: numpy.ndarray
+    improved_length: float
+
+class RouteCache:
+    """Bounded LRU cache of routes keyed by hash of their canonical form
+
+    In canonical form empty paths are dropped, every path is directed from its smaller end customer (only if distances
+    are symmetric) and paths are sorted, so routes visiting the same customers in the same paths share one entry."""
+    def __init__(self, max_size: int = ROUTE_CACHE_SIZE, symmetric: bool = True) -> None:
+        self.max_size = max_size
+        self.symmetric = symmetric
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups which found the route, 0 before the first lookup"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_canonical_route(self, route: list[int] | numpy.ndarray) -> numpy.ndarray:
+        """Returns canonical form of the route, starting and ending in the depot"""
+        route = numpy.asarray(route, dtype=numpy.int32)
+        offsets = numpy.flatnonzero(route == 0).tolist()
+        paths = [route[start + 1:end].tolist() for start, end in zip(offsets[:-1], offsets[1:]) if end > start + 1]
+        if self.symmetric:
+            paths = [path if path[0] < path[-1] else path[::-1] for path in paths]
+        canonical_route = [0]
+        for path in sorted(paths):
+            canonical_route.extend(path)
+            canonical_route.append(0)
+        return numpy.array(canonical_route, dtype=numpy.int32)
+
+    @staticmethod
+    def get_key(canonical_route: numpy.ndarray) -> bytes:
+        """Returns hash of the canonical route"""
+        return blake2b(canonical_route.tobytes(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> CachedRoute:
+        """Returns entry of the route and marks it as recently used, None if the route is not cached"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: bytes, entry: CachedRoute) -> None:
+        """Stores entry of the route, dropping the least recently used one if the cache is full"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forgets all routes and statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
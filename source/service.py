@@ -0,0 +1,67 @@
+"""Long-lived service solving many requests against the same network of cities"""
+from dataclasses import dataclass, field
+from typing import Any
+import numpy
+from city import Cities
+from results import SolverResult
+import solver as solver_module
+
+@dataclass
+class SolveRequest:
+    """Single request: demands of all cities of the network (depot being the first one) and limits of trucks
+
+    parameters override default parameters of the service, solver overrides its default solver class name.
+    Routes given as warm_start (e.g. solution of the previous request) guide the search of ACO solvers."""
+    demands: numpy.ndarray
+    max_capacity: int
+    max_range: int
+    number_of_trucks: int
+    seed: int = None
+    parameters: dict[str, Any] = field(default_factory=dict)
+    solver: str = None
+    warm_start: list[list[int]] = None
+
+class SolverService:
+    """Class solving requests on a fixed network of cities, e.g. daily orders served from the same depot
+
+    Solvers are created once for every solver class and parameters and reset before every request, so distances,
+    candidate lists and heuristic information are calculated only once. Customers with zero demand are not visited."""
+    def __init__(self, cities: Cities, solver: str = 'EnhancedACOSolver', parameters: dict[str, Any] = None) -> None:
+        self.cities = cities
+        self.solver = solver
+        self.parameters = parameters if parameters is not None else {}
+        self._solvers = {}
+
+    def get_solver(self, solver: str = None, parameters: dict[str, Any] = None) -> solver_module.BaseSolver:
+        """Returns solver of given class and parameters (merged with default ones), creating it on first use
+
+        Parameters not accepted by the solver class (e.g. number_of_ants of HeuristicSolver) are ignored."""
+        solver = solver if solver is not None else self.solver
+        accepted = solver_module.get_accepted_parameters(getattr(solver_module, solver))
+        parameters = {name: value for name, value in {**self.parameters, **(parameters if parameters is not None else {})}.items()
+                      if name in accepted}
+        key = (solver, repr(sorted(parameters.items())))
+        if key not in self._solvers:
+            self._solvers[key] = getattr(solver_module, solver)(self.cities, max_capacity=0, max_range=0, number_of_trucks=1,
+                                                                seed=None, **parameters)
+        return self._solvers[key]
+
+    def solve(self, demands: numpy.ndarray, max_capacity: int, max_range: int, number_of_trucks: int, seed: int = None,
+              parameters: dict[str, Any] = None, solver: str = None, warm_start: list[list[int]] = None) -> SolverResult:
+        """Solves a single request and returns its result"""
+        request_solver = self.get_solver(solver, parameters)
+        request_solver.reset(demands, max_capacity, max_range, number_of_trucks, seed)
+        if warm_start is not None:
+            request_solver.warm_start(warm_start)
+        request_solver.solve()
+        return request_solver.get_result()
+
+    def solve_batch(self, requests: list[SolveRequest]) -> list[SolverResult]:
+        """Solves all requests one after another, reusing solvers between them, and returns results in the same order"""
+        results = []
+        for i, request in enumerate(requests):
+            result = self.solve(request.demands, request.max_capacity, request.max_range, request.number_of_trucks, request.seed,
+                                request.parameters, request.solver, request.warm_start)
+            result.metadata = {'request': i, **request.parameters}
+            results.append(result)
+        return results
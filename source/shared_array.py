@@ -0,0 +1,29 @@
+"""Numpy arrays placed in shared memory, so that worker processes can read them without copying"""
+from multiprocessing.shared_memory import SharedMemory
+import numpy
+
+class SharedArray:
+    """Class owning a numpy array stored in a shared memory block"""
+    def __init__(self, array: numpy.ndarray) -> None:
+        self.memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = numpy.ndarray(array.shape, array.dtype, buffer=self.memory.buf)
+        self.array[...] = array
+
+    def get_descriptor(self) -> tuple[str, tuple[int, ...], str]:
+        """Returns picklable description of the array which can be passed to attach in other process"""
+        return (self.memory.name, self.array.shape, self.array.dtype.str)
+
+    @staticmethod
+    def attach(descriptor: tuple[str, tuple[int, ...], str]) -> tuple[SharedMemory, numpy.ndarray]:
+        """Attaches to an array created in other process, memory has to be kept alive as long as array is used"""
+        (name, shape, dtype) = descriptor
+        memory = SharedMemory(name=name)
+        return (memory, numpy.ndarray(shape, numpy.dtype(dtype), buffer=memory.buf))
+
+    def release(self) -> numpy.ndarray:
+        """Frees the shared memory block and returns private copy of the array"""
+        array = self.array.copy()
+        self.array = None
+        self.memory.close()
+        self.memory.unlink()
+        return array
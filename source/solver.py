@@ -1,36 +1,242 @@
 """Solver for CVRP problem"""
 from abc import abstractmethod
-from random import Random
+from bisect import bisect_right
+import copy
+import inspect
+from itertools import accumulate
+import json
+import logging
+from multiprocessing import Pipe, Pool, Process
+from multiprocessing.connection import Connection
+import os
 import sys
 from timeit import default_timer as timer
+from typing import Callable
 import numpy
 
-from city import City
+from city import Cities, City, LazyDistances
+from instrumentation import SolverStatistics
+from local_search import LocalSearch
+from pheromone_update import AntSystemUpdate, ElitistUpdate, IterationBestUpdate, PheromoneUpdate, RouteEdges
+from random_stream import RandomStream
+from route_cache import ROUTE_CACHE_SIZE, CachedRoute, RouteCache
+from results import ResultSink, SolverResult, TextSink
+from shared_array import SharedArray
+from split import SplitDecoder
+
+PYTHON_ENGINE = 'python'
+NUMPY_ENGINE = 'numpy'
+ENGINES = (PYTHON_ENGINE, NUMPY_ENGINE)
+ROUTES_CONSTRUCTION = 'routes'
+GIANT_TOUR_CONSTRUCTION = 'giant_tour'
+CONSTRUCTIONS = (ROUTES_CONSTRUCTION, GIANT_TOUR_CONSTRUCTION)
+MIN_PHEROMONES_SCALE = 1e-12
+LOCAL_SEARCH_NEIGHBOURS = 10
+CANDIDATES_BLOCK_SIZE = 1 << 22
+BRANCHING_LAMBDA = 0.05
+CHECKPOINT_PHEROMONES_FILE = 'pheromones.npy'
+CHECKPOINT_STATE_FILE = 'state.npz'
+RING_MIGRATION = 'ring'
+BEST_MIGRATION = 'best'
+PHEROMONES_MIGRATION = 'pheromones'
+MIGRATIONS = (RING_MIGRATION, BEST_MIGRATION, PHEROMONES_MIGRATION)
+NEAREST_NEIGHBOUR_PHEROMONES = 'nearest_neighbour'
+SAVINGS_PHEROMONES = 'savings'
+INITIAL_PHEROMONES_CONSTRUCTORS = (NEAREST_NEIGHBOUR_PHEROMONES, SAVINGS_PHEROMONES)
+INITIAL_PHEROMONES_CACHE_SIZE = 64
+
+logger = logging.getLogger(__name__)
 
 class BaseSolver:
-    """Base class for a CVRP problem solver"""
-    def __init__(self, cities: list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int) -> None:
-        self.cities = cities
+    """Base class for a CVRP problem solver
+
+    Distances matrix is shared with every other solver created for the same Cities, distances_dtype may be set to
+    numpy.float32 to halve its size. If candidate_list_size is given, every step considers only that many nearest customers of the current city
+    and falls back to scanning all cities only if none of them can be visited.
+    With sparse storage (which requires positions of cities and candidate lists) distances are not stored in a matrix,
+    but calculated when they are needed, so memory used by the solver is linear in number of cities times candidate_list_size.
+
+    With giant tour construction routes are built as a single tour over all customers, without checking capacity
+    and range in every step, and split into paths of trucks at optimal positions by SplitDecoder.
+
+    With instrumentation enabled, time of solving phases is measured in statistics (see enable_instrumentation).
+    Callbacks added with add_callback are called with the solver and number of iteration after every iteration.
+
+    Customers with zero demand are not visited. A solver may be reused for another request on the same cities after reset."""
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
+                engine: str = PYTHON_ENGINE, candidate_list_size: int = None, distances_dtype: numpy.dtype = numpy.float64,
+                instrumentation: bool = False, sparse: bool = False, construction: str = ROUTES_CONSTRUCTION) -> None:
+        if engine not in ENGINES:
+            raise ValueError(F'Unknown construction engine: {engine}, expected one of {ENGINES}')
+        if construction not in CONSTRUCTIONS:
+            raise ValueError(F'Unknown construction: {construction}, expected one of {CONSTRUCTIONS}')
+        self.cities = cities if isinstance(cities, Cities) else Cities.from_list(cities)
+        if sparse and (not candidate_list_size or numpy.isnan(self.cities.positions).any()):
+            raise ValueError('Sparse storage requires candidate lists and positions of cities')
+        self.sparse = sparse
         self.max_capacity = max_capacity
         self.max_range = max_range
         self.number_of_trucks = number_of_trucks
-        self.distances = self._calculate_distances(cities)
-        self.was_visited = [-self.number_of_trucks + 1] + [0] * (len(self.cities) - 1)
+        self.engine = engine
+        self.construction = construction
+        start = timer()
+        self.distances = LazyDistances(self.cities.positions, distances_dtype) if sparse else self.cities.get_distances(distances_dtype)
+        distances_end = timer()
+        self.demands = self.cities.demands
+        self._demand_list = self.demands.tolist()
+        self._return_distances = self.distances[:, 0].copy()
+        self._return_distances[0] = 0
+        self.candidate_list_size = candidate_list_size
+        self.candidates = self._calculate_candidates(self.distances, candidate_list_size) if candidate_list_size else None
+        # Distances are calculated only by the first solver created for the Cities, later ones reuse them
+        self.setup_times = {'distances': (distances_end - start) * 1000, 'candidates': (timer() - distances_end) * 1000}
+        self.split_decoder = None
+        if construction == GIANT_TOUR_CONSTRUCTION:
+            self.split_decoder = SplitDecoder(self.distances, self.demands, max_capacity, max_range, number_of_trucks)
+        self._candidate_lists = self.candidates.tolist() if candidate_list_size else None
+        # With sparse storage distances to candidates (n x k) are kept, so edges to candidates are not calculated again
+        self._candidate_distances = self._candidate_column_maps = None
+        if sparse:
+            self._candidate_distances = self.distances[numpy.arange(len(self.cities))[:, numpy.newaxis], self.candidates]
+            self._candidate_column_maps = [{city: column for column, city in enumerate(row)} for row in self._candidate_lists]
+        self._initial_visits = None
+        self._update_initial_visits()
+        self.was_visited = None
+        self._reset_visits()
         self.rem_capacity = self.max_capacity
         self.rem_range = self.max_range
         self.current_id = 0
+        self._route_buffer = numpy.zeros(0, dtype=numpy.int32)
+        self._route_size = 0
         self.waiting = self.cities[1:]
         self.route = []
         self.route_length = sys.maxsize
         self.result = None
         self.seed = seed
-        self.random = Random(self.seed)
+        self.random = RandomStream(self.seed)
+        self.trace = numpy.zeros(0)
+        self.trace_size = 0
+        self._first_iteration = 0
+        self.solve_time = None
+        self.steps = 0
+        self.feasibility_checks = 0
+        self.statistics = None
+        self.callbacks = []
+        if instrumentation:
+            self.enable_instrumentation()
+
+    def _reset_state(self) -> None:
+        self._reset_visits()
+        self.rem_capacity = self.max_capacity
+        self.rem_range = self.max_range
+        self.current_id = 0
+
+    def reset(self, demands: numpy.ndarray = None, max_capacity: int = None, max_range: int = None,
+              number_of_trucks: int = None, seed: int = None) -> None:
+        """Clears state left by the previous run, so the solver can be used again without repeating precomputation
+
+        Arguments which are given replace parameters of the request, distances and candidate lists stay the same."""
+        if demands is not None:
+            demands = numpy.asarray(demands)
+            if len(demands) != len(self.cities):
+                raise ValueError(F'Expected {len(self.cities)} demands, got {len(demands)}')
+            self.demands = demands
+            self._demand_list = demands.tolist()
+        self.max_capacity = max_capacity if max_capacity is not None else self.max_capacity
+        self.max_range = max_range if max_range is not None else self.max_range
+        self.number_of_trucks = number_of_trucks if number_of_trucks is not None else self.number_of_trucks
+        self.seed = seed if seed is not None else self.seed
+        self.random.seed(self.seed)
+        if self.split_decoder is not None:
+            self.split_decoder.set_request(self.demands, self.max_capacity, self.max_range, self.number_of_trucks)
+        self._update_initial_visits()
+        self._reset_state()
+        self.route = []
+        self.route_length = sys.maxsize
+        self.result = None
+        self.trace_size = 0
+        self.solve_time = None
+        self.steps = 0
+        self.feasibility_checks = 0
+        if self.statistics is not None:
+            self.statistics.clear()
+
+    def warm_start(self, routes: list[list[int]], factor: float = None) -> None:
+        """Uses routes known in advance to guide the search, solvers without pheromones ignore them"""
+
+    @staticmethod
+    def join_paths(paths: list[list[int]]) -> list[int]:
+        """Returns route going through paths (lists of customers without depot, as in TestData.solution) one after another,
+        [0, 0] if there are no paths"""
+        route = [0]
+        for path in paths:
+            route.extend(path)
+            route.append(0)
+        return route if paths else [0, 0]
 
     @abstractmethod
-    def solve(self, output: str = None) -> None:
-        """Triggers solving the problem and outputs analytics information to output if needed"""
+    def solve(self, output: str | ResultSink = None) -> None:
+        """Triggers solving the problem and outputs analytics information to output if needed
+
+        Output is either a sink or a path of text file to which result is appended."""
         raise NotImplementedError('Solving not supported in the base class, use subclass instead')
 
+    def get_result(self) -> SolverResult:
+        """Returns result of the last run together with best lengths found after every iteration"""
+        iterations = numpy.arange(self._first_iteration, self._first_iteration + self.trace_size)
+        return SolverResult(self.get_algorithm_name(), iterations, self.trace[:self.trace_size].copy(), self.solve_time,
+                            self.route if self.result else [], self.route_length if self.result else None)
+
+    def enable_instrumentation(self) -> SolverStatistics:
+        """Starts measuring time of solving phases, methods are wrapped only when enabled so disabled one costs nothing"""
+        self.statistics = SolverStatistics()
+        for phase, names in self._get_instrumented_methods().items():
+            for name in names:
+                setattr(self, name, self.statistics.timed(phase, getattr(type(self), name).__get__(self)))
+        return self.statistics
+
+    def disable_instrumentation(self) -> None:
+        """Stops measuring time of solving phases"""
+        for names in self._get_instrumented_methods().values():
+            for name in names:
+                self.__dict__.pop(name, None)
+        self.statistics = None
+
+    def get_statistics(self) -> dict[str, dict[str, float]]:
+        """Returns collected times of phases together with counters of construction steps and feasibility checks"""
+        statistics = self.statistics.to_dict() if self.statistics is not None else {'times': {}, 'calls': {}, 'counters': {}}
+        statistics['counters'].update(steps=self.steps, feasibility_checks=self.feasibility_checks)
+        return statistics
+
+    def add_callback(self, callback: Callable[["BaseSolver", int], None]) -> None:
+        """Registers callback called with the solver and number of iteration after every iteration"""
+        self.callbacks.append(callback)
+
+    def _get_instrumented_methods(self) -> dict[str, list[str]]:
+        return {'construction': ['_find_route'], 'target_selection': ['_get_target_id', '_get_target_id_vectorized'],
+                'split': ['_split_giant_tour']}
+
+    def _notify_iteration(self, iteration: int) -> None:
+        for callback in self.callbacks:
+            callback(self, iteration)
+
+    def _start_trace(self, size: int, first_iteration: int, kept: int = 0) -> None:
+        trace = numpy.zeros(size)
+        trace[:kept] = self.trace[:kept]
+        self.trace = trace
+        self.trace_size = kept
+        self._first_iteration = first_iteration
+
+    def _record_iteration(self) -> None:
+        self.trace[self.trace_size] = self.route_length if 0 <= self.route_length < sys.maxsize else 0
+        self.trace_size += 1
+
+    def _write_result(self, output: str | ResultSink) -> None:
+        if output is None:
+            return
+        sink = TextSink(output) if isinstance(output, str) else output
+        sink.write(self.get_result())
+
     def print_result(self) -> None:
         """Prints solver result"""
         print(self.get_algorithm_name())
@@ -48,63 +254,180 @@ class BaseSolver:
         raise NotImplementedError('Algorithm name not supported in the base class, use subclass instead')
 
     def _can_visit(self, target_id: int) -> bool:
-        range_fulfilled = ((target_id == 0 and self._get_distance_to(target_id) <= self.rem_range)
-            or self._get_distance_to(target_id) + self.distances[target_id, 0] <= self.rem_range)
         return (self.current_id != target_id
                 and self.was_visited[target_id] < 1
-                and self.cities[target_id].demand <= self.rem_capacity
-                and range_fulfilled)
+                and self._demand_list[target_id] <= self.rem_capacity
+                and self._get_distance_to(target_id) + self._return_distances[target_id] <= self.rem_range)
 
     def _get_target_id(self, allowed_cities: list[int]) -> int:
         return min(allowed_cities, key=self._get_distance_to)
 
-    def _visit(self, target_id: int, route: list[int]) -> float:
+    def _get_target_id_vectorized(self, allowed_cities: numpy.ndarray, columns: numpy.ndarray = None) -> int:
+        """Chooses one of allowed cities, columns are given if all of them are candidates of the current city"""
+        return allowed_cities[numpy.argmin(self._get_distances_to(allowed_cities, columns))]
+
+    def _start_route(self) -> None:
+        # Depot is left at most number_of_trucks times, so every route fits in the preallocated buffer
+        size = len(self.cities) + self.number_of_trucks
+        if len(self._route_buffer) < size:
+            self._route_buffer = numpy.zeros(size, dtype=numpy.int32)
+        self._route_buffer[0] = 0
+        self._route_size = 1
+
+    def _get_built_route(self) -> numpy.ndarray:
+        # View of the buffer, valid until the next route is started
+        return self._route_buffer[:self._route_size]
+
+    def _visit(self, target_id: int) -> float:
         self.was_visited[target_id] += 1
-        self.rem_capacity -= self.cities[target_id].demand
-        self.rem_range -= self._get_distance_to(target_id)
+        self.rem_capacity -= self._demand_list[target_id]
         distance = self._get_distance_to(target_id)
+        self.rem_range -= distance
         self.current_id = target_id
-        route.append(self.current_id)
+        self._route_buffer[self._route_size] = target_id
+        self._route_size += 1
         if target_id == 0:
             self.rem_capacity = self.max_capacity
             self.rem_range = self.max_range
         return distance
 
+    def _update_initial_visits(self) -> None:
+        # Customers without demand are marked as already visited
+        self._initial_visits = [-self.number_of_trucks + 1] + [0 if demand > 0 else 1 for demand in self._demand_list[1:]]
+        if self.engine == NUMPY_ENGINE:
+            self._initial_visits = numpy.array(self._initial_visits)
+
+    def _reset_visits(self) -> None:
+        self.was_visited = self._initial_visits.copy()
+
     def _check_all_visited(self) -> bool:
         return all(self.was_visited[1:])
 
     def _get_distance_to(self, target_id: int) -> float:
+        if self._candidate_column_maps is not None:
+            column = self._candidate_column_maps[self.current_id].get(target_id)
+            if column is not None:
+                return self._candidate_distances[self.current_id, column]
         return self.distances[self.current_id, target_id]
 
-    def _find_route(self) -> tuple[list[int], float]:
+    def _get_distances_to(self, cities_to: numpy.ndarray, columns: numpy.ndarray = None) -> numpy.ndarray:
+        if self._candidate_distances is not None and columns is not None:
+            return self._candidate_distances[self.current_id, columns]
+        return self.distances[self.current_id, cities_to]
+
+    def _find_route(self) -> tuple[numpy.ndarray, float]:
+        if self.construction == GIANT_TOUR_CONSTRUCTION:
+            return self._find_giant_tour_route()
+        if self.engine == NUMPY_ENGINE:
+            return self._find_route_vectorized()
         route_length = 0
-        route = [0]
+        self._start_route()
         while not self._check_all_visited():
-            to_visit = list(filter(self._can_visit, range(0, len(self.cities))))
+            to_visit = None
+            self.steps += 1
+            if self._candidate_lists is not None:
+                to_visit = list(filter(self._can_visit, self._candidate_lists[self.current_id]))
+                self.feasibility_checks += len(self._candidate_lists[self.current_id])
+            if not to_visit:
+                to_visit = list(filter(self._can_visit, range(0, len(self.cities))))
+                self.feasibility_checks += len(self.cities)
             if len(to_visit) == 0:
-                return ([], -1)
+                return (self._route_buffer[:0], -1)
             if 0 in to_visit and len(to_visit) > 1:
                 to_visit.remove(0)
             target_id = self._get_target_id(to_visit)
-            route_length += self._visit(target_id, route)
-        route_length = (route_length + self._visit(0, route) if self._can_visit(0) else -1)
-        return (route, route_length)
+            route_length += self._visit(target_id)
+        return self._return_to_depot(route_length)
+
+    def _find_route_vectorized(self) -> tuple[numpy.ndarray, float]:
+        route_length = 0
+        self._start_route()
+        is_open = self.was_visited < 1
+        remaining = numpy.count_nonzero(self.was_visited[1:] == 0)
+        while remaining > 0:
+            self.steps += 1
+            if self.candidates is not None:
+                candidates = self.candidates[self.current_id]
+                self.feasibility_checks += len(candidates)
+                all_columns = numpy.arange(len(candidates))
+                columns = all_columns[is_open[candidates]
+                                      & (self.demands[candidates] <= self.rem_capacity)
+                                      & (self._get_distances_to(candidates, all_columns) + self._return_distances[candidates] <= self.rem_range)]
+                if len(columns) > 0:
+                    target_id = int(self._get_target_id_vectorized(candidates[columns], columns))
+                    route_length += self._visit(target_id)
+                    is_open[target_id] = False
+                    remaining -= 1
+                    continue
+            self.feasibility_checks += len(self.cities)
+            allowed = (is_open
+                       & (self.demands <= self.rem_capacity)
+                       & (self.distances[self.current_id] + self._return_distances <= self.rem_range))
+            allowed[self.current_id] = False
+            to_visit = numpy.flatnonzero(allowed)
+            if len(to_visit) == 0:
+                return (self._route_buffer[:0], -1)
+            if to_visit[0] == 0 and len(to_visit) > 1:
+                to_visit = to_visit[1:]
+            target_id = int(self._get_target_id_vectorized(to_visit))
+            route_length += self._visit(target_id)
+            if target_id == 0:
+                is_open[0] = self.was_visited[0] < 1
+            else:
+                is_open[target_id] = False
+                remaining -= 1
+        return self._return_to_depot(route_length)
 
-    def _update_result(self, route: list[int], route_length: float) -> None:
+    def _return_to_depot(self, route_length: float) -> tuple[numpy.ndarray, float]:
+        # Route without customers still leaves the depot, so it is [0, 0] as for giant tours and construction solvers
+        if self.current_id != 0 and not self._can_visit(0):
+            return (self._get_built_route(), -1)
+        route_length += self._visit(0)
+        return (self._get_built_route(), route_length)
+
+    def _find_giant_tour_route(self) -> tuple[numpy.ndarray, float]:
+        # Limits of trucks are not checked while the tour is built, returns to the depot are placed by split
+        self._start_route()
+        is_open = numpy.asarray(self.was_visited) < 1
+        is_open[0] = False
+        for _ in range(numpy.count_nonzero(is_open)):
+            self.steps += 1
+            (to_visit, columns) = (None, None)
+            if self.candidates is not None:
+                candidates = self.candidates[self.current_id]
+                self.feasibility_checks += len(candidates)
+                columns = numpy.flatnonzero(is_open[candidates])
+                to_visit = candidates[columns]
+            if to_visit is None or len(to_visit) == 0:
+                self.feasibility_checks += len(self.cities)
+                (to_visit, columns) = (numpy.flatnonzero(is_open), None)
+            if self.engine == NUMPY_ENGINE:
+                target_id = int(self._get_target_id_vectorized(to_visit, columns))
+            else:
+                target_id = self._get_target_id(to_visit.tolist())
+            is_open[target_id] = False
+            self.current_id = target_id
+            self._route_buffer[self._route_size] = target_id
+            self._route_size += 1
+        (route, route_length) = self._split_giant_tour(self._route_buffer[1:self._route_size])
+        self._route_buffer[:len(route)] = route
+        self._route_size = len(route)
+        return (self._get_built_route(), route_length)
+
+    def _split_giant_tour(self, tour: numpy.ndarray) -> tuple[list[int], float]:
+        return self.split_decoder.split(tour)
+
+    def _update_result(self, route: list[int] | numpy.ndarray, route_length: float) -> None:
         if route_length < self.route_length:
-            self.route = route
+            # Routes may be views of reused buffers, so the best one is copied
+            self.route = numpy.asarray(route).tolist()
             self.route_length = route_length
             self.result = True
 
-    def _split_route(self, route: list[int]) -> list[list[int]]:
-        result = []
-        path = [route[0]]
-        for value in route[1:]:
-            path.append(value)
-            if value == 0:
-                result.append(path)
-                path = [0]
-        return result
+    def _split_route(self, route: list[int] | numpy.ndarray) -> list[list[int]]:
+        route = numpy.asarray(route)
+        offsets = numpy.flatnonzero(route == 0).tolist()
+        return [route[start:end + 1].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
 
     def _get_route_length(self, route: list[int]) -> float:
         length = 0
@@ -114,177 +437,1090 @@ class BaseSolver:
         return length
 
     @staticmethod
-    def _calculate_distances(cities: list[City]) -> numpy.ndarray:
-        distances = numpy.zeros((len(cities), len(cities)))
-        for i, city1 in enumerate(cities):
-            for j, city2 in enumerate(cities):
-                if i > j:
-                    distances[i,j] = distances[j,i] = city1.distance(city2)
-        return distances
+    def _calculate_candidates(distances: numpy.ndarray | LazyDistances, size: int) -> numpy.ndarray:
+        """Returns indices of size nearest customers (depot excluded) for every city, ordered by distance
+
+        Rows are processed in blocks, so that the whole distances matrix is never needed at once."""
+        size = min(size, len(distances) - 2)
+        candidates = numpy.empty((len(distances), size), dtype=int)
+        block_size = max(1, CANDIDATES_BLOCK_SIZE // len(distances))
+        for start in range(0, len(distances), block_size):
+            end = min(start + block_size, len(distances))
+            customer_distances = numpy.array(distances[start:end])
+            customer_distances[:, 0] = numpy.inf
+            customer_distances[numpy.arange(end - start), numpy.arange(start, end)] = numpy.inf
+            nearest = numpy.argpartition(customer_distances, size, axis=1)[:, :size]
+            order = numpy.argsort(numpy.take_along_axis(customer_distances, nearest, axis=1), axis=1, kind='stable')
+            candidates[start:end] = numpy.take_along_axis(nearest, order, axis=1)
+        return candidates
 
 class HeuristicSolver(BaseSolver):
     """Class implementing a solver for CVRP problem using heuristic algorithm"""
-    def __init__(self, cities: list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int) -> None:
-        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed)
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int, **kwargs) -> None:
+        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed, **kwargs)
         self._current_route = [0]
 
-    def solve(self, output: str = None) -> None:
-        if output is not None:
-            file = open(output, 'a', encoding='utf-8')
-            file.write(F'{self.get_algorithm_name()}\n')
+    def solve(self, output: str | ResultSink = None) -> None:
+        self._start_trace(1, 0)
+        start = timer()
         try:
-            start = timer()
             (route, route_length) = self._find_route()
             if route_length != -1:
                 self._update_result(route, route_length)
             else:
                 self.result = False
-            end = timer()
+            self._record_iteration()
+            self._notify_iteration(0)
         finally:
-            if output is not None and not file.closed:
-                file.write(F'{0} {self.route_length if 0 <= self.route_length < sys.maxsize else 0}\n')
-                file.write(F'Time: {(end - start) * 1000} ms\n')
-                file.close()
+            self.solve_time = (timer() - start) * 1000
+            self._write_result(output)
 
     def get_algorithm_name(self) -> str:
         return 'Heuristic'
 
+class ConstructionSolver(BaseSolver):
+    """Base class for solvers constructing all paths of the solution at once, in a single iteration
+
+    Solution using more paths than number_of_trucks is not accepted."""
+    def solve(self, output: str | ResultSink = None) -> None:
+        self._start_trace(1, 0)
+        start = timer()
+        try:
+            paths = self._construct_paths()
+            if paths is not None and len(paths) <= self.number_of_trucks:
+                route = self.join_paths(paths)
+                self._update_result(route, self._get_route_length(route))
+            else:
+                self.result = False
+            self._record_iteration()
+            self._notify_iteration(0)
+        finally:
+            self.solve_time = (timer() - start) * 1000
+            self._write_result(output)
+
+    @abstractmethod
+    def _construct_paths(self) -> list[list[int]]:
+        """Returns paths (lists of customers without depot) or None if some customer cannot be served at all"""
+        raise NotImplementedError('Construction not supported in the base class, use subclass instead')
+
+    def _get_customers(self) -> numpy.ndarray:
+        customers = numpy.flatnonzero(self.demands[1:] > 0) + 1
+        if (self.demands[customers] > self.max_capacity).any() or (2 * self._return_distances[customers] > self.max_range).any():
+            return None
+        return customers
+
+class SavingsSolver(ConstructionSolver):
+    """Class implementing a solver for CVRP problem using Clarke-Wright savings algorithm
+
+    Starting from a separate path to every customer, paths are merged at their ends in order of decreasing savings
+    d(0, i) + d(0, j) - d(i, j), as long as capacity and range of the truck are not exceeded. Paths are tracked
+    with union-find, so sorting the savings, O(n^2 log n), dominates the time of construction. If candidate lists are given,
+    only savings of pairs of candidates are considered."""
+    def get_algorithm_name(self) -> str:
+        return 'Savings'
+
+    def _construct_paths(self) -> list[list[int]]:
+        customers = self._get_customers()
+        if customers is None:
+            return None
+        return_distances = self._return_distances
+        if self.candidates is None:
+            (first, second) = numpy.triu_indices(len(customers), 1)
+            (first, second) = (customers[first], customers[second])
+        else:
+            # Only pairs of candidates are merged, so the number of savings is linear in number of customers
+            (first, second) = (numpy.repeat(customers, self.candidates.shape[1]), self.candidates[customers].ravel())
+            served = self.demands[second] > 0
+            pairs = numpy.unique(numpy.minimum(first, second)[served] * len(self.cities) + numpy.maximum(first, second)[served])
+            (first, second) = numpy.divmod(pairs, len(self.cities))
+        savings = return_distances[first] + return_distances[second] - self.distances[first, second]
+        positive = savings > 0
+        (first, second, savings) = (first[positive], second[positive], savings[positive])
+        order = numpy.argsort(-savings, kind='stable')
+
+        parent = list(range(len(self.cities)))
+        loads = list(self._demand_list)
+        lengths = (2 * return_distances).tolist()
+        neighbours = [[] for _ in range(len(self.cities))]
+
+        def find(city: int) -> int:
+            while parent[city] != city:
+                parent[city] = parent[parent[city]]
+                city = parent[city]
+            return city
+
+        for (i, j, saving) in zip(first[order].tolist(), second[order].tolist(), savings[order].tolist()):
+            if len(neighbours[i]) == 2 or len(neighbours[j]) == 2:
+                continue
+            (root_i, root_j) = (find(i), find(j))
+            if (root_i == root_j or loads[root_i] + loads[root_j] > self.max_capacity
+                    or lengths[root_i] + lengths[root_j] - saving > self.max_range):
+                continue
+            parent[root_j] = root_i
+            loads[root_i] += loads[root_j]
+            lengths[root_i] += lengths[root_j] - saving
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+        return self._get_paths(customers.tolist(), neighbours)
+
+    @staticmethod
+    def _get_paths(customers: list[int], neighbours: list[list[int]]) -> list[list[int]]:
+        paths = []
+        visited = set()
+        for customer in customers:
+            if customer in visited or len(neighbours[customer]) == 2:
+                continue
+            (previous, current, path) = (None, customer, [])
+            while current is not None:
+                path.append(current)
+                visited.add(current)
+                (previous, current) = (current, next((city for city in neighbours[current] if city != previous), None))
+            paths.append(path)
+        return paths
+
+class SweepSolver(ConstructionSolver):
+    """Class implementing a solver for CVRP problem using sweep algorithm
+
+    Customers are sorted by polar angle around the depot, starting after the widest gap between them, and assigned
+    to paths in this order. A new path is started when capacity or range of the truck would be exceeded."""
+    def get_algorithm_name(self) -> str:
+        return 'Sweep'
+
+    def _construct_paths(self) -> list[list[int]]:
+        if numpy.isnan(self.cities.positions).any():
+            raise ValueError('Sweep algorithm requires positions of cities')
+        customers = self._get_customers()
+        if customers is None:
+            return None
+        if len(customers) == 0:
+            return []
+        offsets = self.cities.positions[customers] - self.cities.positions[0]
+        angles = numpy.arctan2(offsets[:, 1], offsets[:, 0])
+        order = numpy.argsort(angles, kind='stable')
+        gaps = numpy.diff(numpy.append(angles[order], angles[order[0]] + 2 * numpy.pi))
+        order = numpy.roll(order, -(int(numpy.argmax(gaps)) + 1))
+
+        paths, path = [], []
+        (load, length) = (0, 0.0)
+        for customer in customers[order].tolist():
+            demand = self._demand_list[customer]
+            last = path[-1] if path else 0
+            if path and (load + demand > self.max_capacity
+                         or length + self.distances[last, customer] + self._return_distances[customer] > self.max_range):
+                paths.append(path)
+                (path, load, length, last) = ([], 0, 0.0, 0)
+            path.append(customer)
+            load += demand
+            length += self.distances[last, customer]
+        paths.append(path)
+        return paths
+
+class _ColonyRoutes:
+    """Current and best routes of all ants of a colony, stored in preallocated int32 blocks of number_of_ants x max_size
+    together with their sizes and lengths (-1 for infeasible routes)"""
+    __slots__ = ('current', 'best', 'current_sizes', 'best_sizes', 'current_lengths', 'best_lengths')
+
+    def __init__(self, number_of_ants: int, max_size: int) -> None:
+        self.current = numpy.zeros((number_of_ants, max_size), dtype=numpy.int32)
+        self.best = numpy.zeros_like(self.current)
+        self.current_sizes = numpy.zeros(number_of_ants, dtype=int)
+        self.best_sizes = numpy.zeros(number_of_ants, dtype=int)
+        self.current_lengths = numpy.full(number_of_ants, -1.0)
+        self.best_lengths = numpy.full(number_of_ants, float(sys.maxsize))
+
+    def reserve(self, max_size: int) -> None:
+        """Grows the blocks so that routes of max_size cities fit, keeping routes stored so far"""
+        if max_size <= self.current.shape[1]:
+            return
+        (current, best) = (self.current, self.best)
+        self.current = numpy.zeros((len(current), max_size), dtype=numpy.int32)
+        self.best = numpy.zeros_like(self.current)
+        self.current[:, :current.shape[1]] = current
+        self.best[:, :best.shape[1]] = best
+
+    def get_depot_offsets(self, ant_id: int) -> numpy.ndarray:
+        """Returns positions of the depot in the current route of the ant, paths lie between consecutive offsets"""
+        return numpy.flatnonzero(self.current[ant_id, :self.current_sizes[ant_id]] == 0)
+
 class _AntSolution:
-    def __init__(self) -> None:
-        self.current_route = [0]
-        self.current_route_length = -1
-        self.best_route = []
-        self.best_route_length = sys.maxsize
+    """View of a single ant over routes of the colony, current and best route are rows of the colony blocks"""
+    __slots__ = ('routes', 'ant_id')
+
+    def __init__(self, routes: _ColonyRoutes, ant_id: int) -> None:
+        self.routes = routes
+        self.ant_id = ant_id
+
+    @property
+    def current_route(self) -> numpy.ndarray:
+        """Current route of the ant, as a view of the colony block"""
+        return self.routes.current[self.ant_id, :self.routes.current_sizes[self.ant_id]]
+
+    @property
+    def current_route_length(self) -> float:
+        """Length of the current route, -1 if it is not feasible"""
+        return float(self.routes.current_lengths[self.ant_id])
+
+    @property
+    def best_route(self) -> numpy.ndarray:
+        """Best route found by the ant, as a view of the colony block"""
+        return self.routes.best[self.ant_id, :self.routes.best_sizes[self.ant_id]]
+
+    @property
+    def best_route_length(self) -> float:
+        """Length of the best route found by the ant"""
+        return float(self.routes.best_lengths[self.ant_id])
+
+    def set_current_route(self, route: list[int] | numpy.ndarray, route_length: float) -> None:
+        """Copies route into the row of the ant"""
+        self.routes.reserve(len(route))
+        self.routes.current[self.ant_id, :len(route)] = route
+        self.routes.current_sizes[self.ant_id] = len(route)
+        self.routes.current_lengths[self.ant_id] = route_length
 
     def check_current_route(self) -> bool:
         """Checks if current solution is better than the best one and updates it if it is needed"""
-        if (self.current_route_length == -1 or self.current_route_length >= self.best_route_length):
+        routes = self.routes
+        (ant_id, route_length) = (self.ant_id, routes.current_lengths[self.ant_id])
+        if (route_length == -1 or route_length >= routes.best_lengths[ant_id]):
             return False
-        self.best_route = self.current_route
-        self.best_route_length = self.current_route_length
+        size = routes.current_sizes[ant_id]
+        routes.best[ant_id, :size] = routes.current[ant_id, :size]
+        routes.best_sizes[ant_id] = size
+        routes.best_lengths[ant_id] = route_length
         return True
 
     def reset(self) -> None:
         """Resets current route and solution"""
-        self.current_route = [0]
-        self.current_route_length = -1
+        self.set_current_route([0], -1)
+
+    def clear(self) -> None:
+        """Resets both current and best solution"""
+        self.reset()
+        self.routes.best_sizes[self.ant_id] = 0
+        self.routes.best_lengths[self.ant_id] = sys.maxsize
+
+def get_accepted_parameters(solver_class: type) -> set[str]:
+    """Returns names of parameters accepted by constructors of the solver class and its base classes"""
+    return {name for cls in solver_class.__mro__ if '__init__' in vars(cls)
+            for name in inspect.signature(cls.__init__).parameters}
+
+_worker_solver = None
+_worker_memory = []
+
+def _init_colony_worker(solver: "ACOSolver", distances: tuple, choice_info: tuple, explicit_demands: numpy.ndarray = None,
+                        instrumentation: bool = False) -> None:
+    global _worker_solver # pylint: disable=global-statement
+    if distances is not None:
+        (distances_memory, solver.distances) = SharedArray.attach(distances)
+        _worker_memory.append(distances_memory)
+    if explicit_demands is not None:
+        solver.cities = Cities(None, explicit_demands, solver.distances)
+        solver.waiting = solver.cities[1:]
+    (choice_info_memory, solver._choice_info) = SharedArray.attach(choice_info)
+    _worker_memory.append(choice_info_memory)
+    if solver.split_decoder is not None:
+        solver.split_decoder.distances = solver.distances
+    if instrumentation:
+        solver.enable_instrumentation()
+    _worker_solver = solver
+
+def _build_colony_ant(iteration: int, ant_id: int) -> tuple[numpy.ndarray, float, int, int, tuple[dict[str, float], dict[str, int]]]:
+    (steps, feasibility_checks) = (_worker_solver.steps, _worker_solver.feasibility_checks)
+    statistics = _worker_solver.statistics
+    if statistics is not None:
+        statistics.clear()
+    (route, route_length) = _worker_solver._build_ant(iteration, ant_id)
+    # Results of a chunk are sent together, so the route and phase times are copied out of reused objects
+    phases = (dict(statistics.times), dict(statistics.calls)) if statistics is not None else None
+    return (route.copy(), route_length, _worker_solver.steps - steps, _worker_solver.feasibility_checks - feasibility_checks, phases)
 
 class ACOSolver(BaseSolver):
-    """Class implementing a solver for CVRP problem using ACO"""
-    def __init__(self, cities: list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
-                number_of_ants: int, alpha: float, beta: float, pheromones_factor: float, evaporate_factor: float, number_of_iterations: int) -> None:
-        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed)
+    """Class implementing a solver for CVRP problem using ACO
+
+    Evaporation is lazy: pheromones are stored divided by pheromones_scale, which alone is decreased every iteration.
+    Choice probabilities do not depend on the common scale, so the matrix is rescaled only when the scale gets too small.
+
+    In synchronous mode all ants of an iteration build their routes on the same pheromones snapshot and lay pheromones
+    afterwards, which allows spreading construction over number_of_workers processes (all CPUs by default).
+
+    If local_search_ants is positive, routes of that many best ants of every iteration are improved with local search.
+    Improved routes are kept in LRU cache of route_cache_size routes, so routes found again (possibly with paths
+    in different order or direction) are not improved again. Hits and misses of the cache are counted in statistics.
+
+    Routes reinforcing pheromones are chosen by pheromone_update strategy, by default every ant lays pheromones (Ant System).
+    Initial pheromones are either given as a value, or estimated as 1 / (n * L) from length L of the route found
+    by nearest neighbour heuristic (NEAREST_NEIGHBOUR_PHEROMONES) or savings algorithm (SAVINGS_PHEROMONES).
+    Estimation is deferred until pheromones are first needed for the current request (by solve, warm_start or
+    loading and reading pheromones) and estimates of the last INITIAL_PHEROMONES_CACHE_SIZE requests are reused.
+
+    Solving stops before number_of_iterations when time_limit (in seconds) passes, when the best route is within
+    target_gap of the optimal length, or on stagnation: no improvement for stagnation_iterations iterations or
+    lambda-branching factor of pheromones below min_branching_factor. With reinitialize_on_stagnation pheromones
+    are reset on stagnation instead. The time limit is checked after every ant (every iteration in synchronous mode)
+    and the best route found so far is kept as the result.
+
+    With sparse storage pheromones, heuristic information and choice info are stored only for edges to candidates
+    of every city, with an extra column of pheromones shared by all other edges leaving the city. Pheromones laid on
+    these edges are dropped, so get_pheromones returns n x (k + 1) matrix in this case.
+
+    Pheromones may be warm started from known routes and saved to (or loaded from) memory-mapped snapshots.
+    If checkpoint_path is given, pheromones and the best route are saved there every checkpoint_interval iterations
+    and when solving ends, so that an interrupted run can be continued after load_checkpoint."""
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
+                number_of_ants: int, alpha: float, beta: float, pheromones_factor: float, evaporate_factor: float, number_of_iterations: int,
+                synchronous: bool = False, number_of_workers: int = None, local_search_ants: int = 0,
+                time_limit: float = None, optimal: float = None, target_gap: float = None, stagnation_iterations: int = None,
+                min_branching_factor: float = None, reinitialize_on_stagnation: bool = False,
+                checkpoint_path: str = None, checkpoint_interval: int = None, pheromone_update: PheromoneUpdate = None,
+                initial_pheromones: float | str = 1.0, route_cache_size: int = ROUTE_CACHE_SIZE, **kwargs) -> None:
+        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed, **kwargs)
+        if target_gap is not None and optimal is None:
+            raise ValueError('Optimal length has to be given together with target_gap')
+        self.time_limit = time_limit
+        self.target_length = optimal * (1 + target_gap) if target_gap is not None else None
+        self.stagnation_iterations = stagnation_iterations
+        self.min_branching_factor = min_branching_factor
+        self.reinitialize_on_stagnation = reinitialize_on_stagnation
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval if checkpoint_path is not None else None
+        self.start_iteration = 0
+        self.stop_reason = None
+        self.restarts = 0
+        self._deadline = None
+        self._iterations_without_improvement = 0
+        self.synchronous = synchronous
+        self.number_of_workers = number_of_workers
+        self.local_search_ants = local_search_ants
+        self.local_search = None
+        self.route_cache = None
+        if local_search_ants > 0:
+            neighbours = self.candidates if self.candidates is not None else self._calculate_candidates(self.distances, LOCAL_SEARCH_NEIGHBOURS)
+            # Lazy distances are euclidean, explicit matrices may be asymmetric
+            symmetric = self.sparse or bool(numpy.array_equal(self.distances, self.distances.T))
+            self.local_search = LocalSearch(self.distances, self.demands, max_capacity, max_range, neighbours, symmetric)
+            self.route_cache = RouteCache(route_cache_size, symmetric)
         self.number_of_ants = number_of_ants
         self.alpha = alpha
         self.beta = beta
         self.pheromones_factor = pheromones_factor
         self.evaporate_factor = evaporate_factor
         self.number_of_iterations = number_of_iterations
-        self.pheromones = numpy.ones((len(cities), len(cities)))
+        self.pheromone_update = pheromone_update if pheromone_update is not None else AntSystemUpdate()
+        if isinstance(initial_pheromones, str) and initial_pheromones not in INITIAL_PHEROMONES_CONSTRUCTORS:
+            raise ValueError(F'Unknown initial pheromones: {initial_pheromones}, expected a number or one of {INITIAL_PHEROMONES_CONSTRUCTORS}')
+        self._initial_pheromones = initial_pheromones
+        self._initial_pheromones_estimates = {}
+        self._pheromones_constructor = None
+        # Estimated initial pheromones are replaced by the estimate in _ensure_initial_pheromones
+        self._is_estimate_pending = isinstance(initial_pheromones, str)
+        self.initial_pheromones = 1.0 if self._is_estimate_pending else initial_pheromones
+        self.pheromones_scale = 1.0
+        self._candidate_keys = self._candidate_columns = None
+        if self.sparse:
+            self.pheromones = numpy.full((len(self.cities), self.candidates.shape[1] + 1), self.initial_pheromones)
+            self._off_diagonal = numpy.ones_like(self.pheromones, dtype=bool)
+            self.heuristic = self._calculate_heuristic(self._candidate_distances)
+            self._weighted_heuristic = numpy.ones_like(self.pheromones)
+            self._weighted_heuristic[:, :-1] = self.heuristic ** self.beta
+            keys = (numpy.arange(len(self.cities))[:, numpy.newaxis] * len(self.cities) + self.candidates).ravel()
+            order = numpy.argsort(keys)
+            (self._candidate_keys, self._candidate_columns) = (keys[order], (order % self.candidates.shape[1]))
+        else:
+            self.pheromones = numpy.full((len(self.cities), len(self.cities)), self.initial_pheromones)
+            self._off_diagonal = ~numpy.eye(len(self.cities), dtype=bool)
+            self.heuristic = self._calculate_heuristic(self.distances)
+            self._weighted_heuristic = self.heuristic ** self.beta
+        self._choice_info = numpy.empty_like(self.pheromones)
+        self._update_choice_info()
         self.current_ant_id = 0
-        self.ants = [_AntSolution() for _ in range(number_of_ants)]
+        self.colony_routes = _ColonyRoutes(number_of_ants, len(self.cities) + number_of_trucks)
+        self.ants = [_AntSolution(self.colony_routes, ant_id) for ant_id in range(number_of_ants)]
+        for ant in self.ants:
+            ant.clear()
+        self._colony_seed = None
+        self._colony_pool = None
 
-    def solve(self, output: str = None) -> None:
-        if output is not None:
-            file = open(output, 'a', encoding='utf-8')
-            file.write(F'{self.get_algorithm_name()}\n')
+    def solve(self, output: str | ResultSink = None) -> None:
+        # Iterations done before the checkpoint was loaded are kept in the trace
+        (first_iteration, self.start_iteration) = (self.start_iteration, 0)
+        start = timer()
+        self._deadline = start + self.time_limit if self.time_limit is not None else None
+        # Time of estimating initial pheromones counts towards the time limit
+        self._ensure_initial_pheromones()
+        self._start_trace(self.number_of_iterations, 1, first_iteration)
+        shared_arrays = []
+        self.stop_reason = 'iterations'
+        self._iterations_without_improvement = 0
         try:
-            start = timer()
-            for i in range(self.number_of_iterations):
-                for ant in self.ants:
-                    ant.reset()
-                    self.was_visited = [-self.number_of_trucks + 1] + [0] * (len(self.cities) - 1)
-                    (ant.current_route, ant.current_route_length) = self._find_route()
-                    self._lay_pheromones(ant.current_route)
-                    if ant.check_current_route():
-                        self._update_result(ant.best_route, ant.best_route_length)
-                if output is not None and not file.closed:
-                    file.write(F'{i+1} {self.route_length if 0 <= self.route_length < sys.maxsize else 0}\n')
+            if self.synchronous:
+                shared_arrays = self._start_colony()
+            for i in range(first_iteration, self.number_of_iterations):
+                previous_length = self.route_length
+                if self.synchronous:
+                    self._build_ants_synchronously(i)
+                else:
+                    self._build_ants()
+                self._record_iteration()
+                self._count_ants()
+                self._notify_iteration(i + 1)
+                if self._should_stop(previous_length):
+                    break
                 self._update_pheromones()
-            end = timer()
+                if self.checkpoint_interval and (i + 1) % self.checkpoint_interval == 0:
+                    self.save_checkpoint(self.checkpoint_path)
+            if self.checkpoint_path is not None:
+                self.save_checkpoint(self.checkpoint_path)
         finally:
-            if output is not None and not file.closed:
-                file.write(F'Time: {(end - start) * 1000} ms\n')
-                file.close()
+            self._stop_colony(shared_arrays)
+            self.solve_time = (timer() - start) * 1000
+            self._write_result(output)
+
+    def reset(self, demands: numpy.ndarray = None, max_capacity: int = None, max_range: int = None,
+              number_of_trucks: int = None, seed: int = None) -> None:
+        super().reset(demands, max_capacity, max_range, number_of_trucks, seed)
+        if self.local_search is not None:
+            self.local_search.set_request(self.demands, self.max_capacity, self.max_range)
+            self.route_cache.clear()
+        self._is_estimate_pending = isinstance(self._initial_pheromones, str)
+        self._reset_pheromones()
+        self.colony_routes.reserve(len(self.cities) + self.number_of_trucks)
+        for ant in self.ants:
+            ant.clear()
+        self.current_ant_id = 0
+        self.start_iteration = 0
+        self.stop_reason = None
+        self.restarts = 0
+        self._iterations_without_improvement = 0
 
     def get_algorithm_name(self) -> str:
         return 'ACO'
 
+    def _get_instrumented_methods(self) -> dict[str, list[str]]:
+        return {**super()._get_instrumented_methods(), 'deposit': ['_lay_pheromones_batch', '_lay_colony_pheromones', '_lay_reinforcements'],
+                'evaporation': ['_evaporate_pheromones'], 'local_search': ['_improve_ants']}
+
+    def get_statistics(self) -> dict[str, dict[str, float]]:
+        statistics = super().get_statistics()
+        if self.route_cache is not None:
+            statistics['counters'].update(route_cache_hits=self.route_cache.hits, route_cache_misses=self.route_cache.misses)
+        return statistics
+
+    def _count_ants(self) -> None:
+        if self.statistics is None:
+            return
+        self.statistics.count('ants', len(self.ants))
+        for ant in self.ants:
+            if ant.current_route_length < 0:
+                self.statistics.count('infeasible_ants')
+            else:
+                self.statistics.count('depot_returns', len(self.colony_routes.get_depot_offsets(ant.ant_id)) - 2)
+
+    def _is_deadline_exceeded(self) -> bool:
+        return self._deadline is not None and timer() >= self._deadline
+
+    def _should_stop(self, previous_length: float) -> bool:
+        if self._is_deadline_exceeded():
+            self.stop_reason = 'time'
+            return True
+        if self.target_length is not None and self.result and self.route_length <= self.target_length:
+            self.stop_reason = 'target'
+            return True
+        self._iterations_without_improvement = 0 if self.route_length < previous_length else self._iterations_without_improvement + 1
+        stagnated = ((self.stagnation_iterations is not None and self._iterations_without_improvement >= self.stagnation_iterations)
+                     or (self.min_branching_factor is not None and self.get_branching_factor() < self.min_branching_factor))
+        if not stagnated:
+            return False
+        if not self.reinitialize_on_stagnation:
+            self.stop_reason = 'stagnation'
+            return True
+        self._reset_pheromones()
+        self._iterations_without_improvement = 0
+        self.restarts += 1
+        return False
+
+    def get_branching_factor(self) -> float:
+        """Returns average number of edges leaving a city with pheromones above lambda-branching threshold"""
+        pheromones = numpy.where(self._off_diagonal, self.pheromones, numpy.nan)
+        minimum = numpy.nanmin(pheromones, axis=1, keepdims=True)
+        maximum = numpy.nanmax(pheromones, axis=1, keepdims=True)
+        return float(numpy.mean(numpy.sum(pheromones >= minimum + BRANCHING_LAMBDA * (maximum - minimum), axis=1)))
+
+    def _ensure_initial_pheromones(self) -> None:
+        if not self._is_estimate_pending:
+            return
+        self._is_estimate_pending = False
+        self.initial_pheromones = self._estimate_initial_pheromones()
+        self._reset_pheromones()
+
+    def _estimate_initial_pheromones(self) -> float:
+        key = (hash(self.demands.tobytes()), self.max_capacity, self.max_range, self.number_of_trucks)
+        if key in self._initial_pheromones_estimates:
+            return self._initial_pheromones_estimates[key]
+        if self._pheromones_constructor is None:
+            constructor_class = HeuristicSolver if self._initial_pheromones == NEAREST_NEIGHBOUR_PHEROMONES else SavingsSolver
+            self._pheromones_constructor = constructor_class(self.cities, self.max_capacity, self.max_range, self.number_of_trucks, None,
+                                                             distances_dtype=self.distances.dtype, sparse=self.sparse,
+                                                             candidate_list_size=self.candidate_list_size)
+        constructor = self._pheromones_constructor
+        constructor.reset(self.demands, self.max_capacity, self.max_range, self.number_of_trucks)
+        constructor.solve()
+        if constructor.result:
+            estimate = 1 / (len(self.cities) * constructor.route_length)
+        else:
+            logger.warning('No route found by %s, initial pheromones are set to 1', constructor.get_algorithm_name())
+            estimate = 1.0
+        if len(self._initial_pheromones_estimates) >= INITIAL_PHEROMONES_CACHE_SIZE:
+            del self._initial_pheromones_estimates[next(iter(self._initial_pheromones_estimates))]
+        self._initial_pheromones_estimates[key] = estimate
+        return estimate
+
+    def _reset_pheromones(self) -> None:
+        self.pheromones.fill(self.initial_pheromones)
+        self.pheromones_scale = 1.0
+        self._update_choice_info()
+
+    def _build_ants(self) -> None:
+        # With local search pheromones are laid after routes are improved, so improved routes are reinforced as in synchronous mode
+        deposit_after_improving = self.pheromone_update.deposit_during_construction and self.local_search is not None
+        for ant in self.ants:
+            if self._is_deadline_exceeded():
+                return
+            self._reset_visits()
+            ant.set_current_route(*self._find_route())
+            if self.pheromone_update.deposit_during_construction and not deposit_after_improving:
+                self._lay_pheromones(ant.current_route, route_length=ant.current_route_length)
+            if ant.check_current_route():
+                self._update_result(ant.best_route, ant.best_route_length)
+        for ant in self._improve_ants():
+            if ant.check_current_route():
+                self._update_result(ant.best_route, ant.best_route_length)
+        if deposit_after_improving:
+            self._lay_colony_pheromones()
+
+    def _build_ants_synchronously(self, iteration: int) -> None:
+        if self._colony_pool is not None:
+            arguments = [(iteration, ant_id) for ant_id in range(self.number_of_ants)]
+            chunk_size = max(1, self.number_of_ants // (4 * self.number_of_workers))
+            solutions = self._colony_pool.starmap(_build_colony_ant, arguments, chunk_size)
+            for ant, (route, route_length, steps, feasibility_checks, phases) in zip(self.ants, solutions):
+                ant.set_current_route(route, route_length)
+                self.steps += steps
+                self.feasibility_checks += feasibility_checks
+                if phases is not None and self.statistics is not None:
+                    self.statistics.merge(*phases)
+        else:
+            for ant in self.ants:
+                ant.set_current_route(*self._build_ant(iteration, ant.ant_id))
+        self._improve_ants()
+        if self.pheromone_update.deposit_during_construction:
+            self._lay_colony_pheromones()
+        for ant in self.ants:
+            if ant.check_current_route():
+                self._update_result(ant.best_route, ant.best_route_length)
+
+    def _improve_ants(self) -> list[_AntSolution]:
+        if self.local_search is None:
+            return []
+        feasible_ants = [ant for ant in self.ants if ant.current_route_length > 0]
+        best_ants = sorted(feasible_ants, key=lambda ant: ant.current_route_length)[:self.local_search_ants]
+        for ant in best_ants:
+            ant.set_current_route(*self._improve_route(ant.current_route, ant.current_route_length))
+        return best_ants
+
+    def _improve_route(self, route: numpy.ndarray, route_length: float) -> tuple[numpy.ndarray, float]:
+        # Local search starts from the canonical route, so results are the same whether they are cached or not
+        canonical_route = self.route_cache.get_canonical_route(route)
+        key = self.route_cache.get_key(canonical_route)
+        entry = self.route_cache.get(key)
+        if entry is None:
+            (improved_route, improved_length) = self.local_search.improve(canonical_route.tolist())
+            entry = CachedRoute(route_length, numpy.array(improved_route, dtype=numpy.int32), improved_length)
+            self.route_cache.put(key, entry)
+        return (entry.improved_route, entry.improved_length)
+
+    def _build_ant(self, iteration: int, ant_id: int) -> tuple[numpy.ndarray, float]:
+        # Every ant gets its own substream of the seed, so the result does not depend on the number of workers
+        self.random = RandomStream(self._colony_seed, (iteration, ant_id))
+        self._reset_state()
+        return self._find_route()
+
+    def _start_colony(self) -> list[SharedArray]:
+        self._colony_seed = self.random.seed_sequence.entropy
+        if self.number_of_workers is None:
+            self.number_of_workers = os.cpu_count() or 1
+        if self.number_of_workers <= 1:
+            return []
+        # Lazy distances are small enough to be copied to every worker
+        shared_distances = SharedArray(self.distances) if not self.sparse else None
+        shared_choice_info = SharedArray(self._choice_info)
+        self._choice_info = shared_choice_info.array
+        worker_solver = copy.copy(self)
+        worker_solver.disable_instrumentation()
+        worker_solver.callbacks = []
+        worker_solver._choice_info = None
+        if shared_distances is not None:
+            worker_solver.distances = None
+        worker_solver.pheromones = worker_solver.heuristic = worker_solver._weighted_heuristic = None
+        worker_solver._off_diagonal = worker_solver.local_search = worker_solver.route_cache = worker_solver._pheromones_constructor = None
+        worker_solver.colony_routes = worker_solver.ants = None
+        # Explicit distances would be pickled with cities, so workers rebuild cities around the shared matrix
+        explicit_demands = self.cities.demands if self.cities.is_explicit and shared_distances is not None else None
+        if explicit_demands is not None:
+            worker_solver.cities = worker_solver.waiting = None
+        if worker_solver.split_decoder is not None:
+            worker_solver.split_decoder = copy.copy(worker_solver.split_decoder)
+            worker_solver.split_decoder.distances = None
+        self._colony_pool = Pool(self.number_of_workers, _init_colony_worker,
+                                 (worker_solver, shared_distances.get_descriptor() if shared_distances is not None else None,
+                                  shared_choice_info.get_descriptor(), explicit_demands, self.statistics is not None))
+        return [shared_array for shared_array in (shared_distances, shared_choice_info) if shared_array is not None]
+
+    def _stop_colony(self, shared_arrays: list[SharedArray]) -> None:
+        if self._colony_pool is not None:
+            self._colony_pool.terminate()
+            self._colony_pool.join()
+            self._colony_pool = None
+        if shared_arrays:
+            for shared_array in shared_arrays[:-1]:
+                shared_array.release()
+            self._choice_info = shared_arrays[-1].release()
+
     def _get_target_id(self, allowed_cities: list[int]) -> int:
+        if self.sparse:
+            # Edges to candidates are read by their columns, keys of sparse storage are searched only for other edges
+            column_map = self._candidate_column_maps[self.current_id]
+            if not all(city in column_map for city in allowed_cities):
+                return int(self._get_target_id_vectorized(numpy.array(allowed_cities)))
+            (indices, distances) = ([column_map[city] for city in allowed_cities], self._candidate_distances[self.current_id])
+        else:
+            (indices, distances) = (allowed_cities, self.distances[self.current_id])
         weights = []
-        for city in allowed_cities:
-            if self._get_distance_to(city) == 0:
+        choice_info = self._choice_info[self.current_id]
+        for city, index in zip(allowed_cities, indices):
+            if distances[index] == 0:
                 return city
-            pheromon_factor = self.pheromones[self.current_id, city]
-            heuristic_factor = 1 / self._get_distance_to(city)
-            weights.append((pheromon_factor ** self.alpha) * (heuristic_factor ** self.beta))
-        if sum(weights) <= 0.0:
-            weights = None
-        return self.random.choices(allowed_cities, weights, k = 1)[0]
-
-    def _lay_pheromones(self, route: list[int], factor: float = None) -> None:
+            weights.append(choice_info[index])
+        cumulative_weights = list(accumulate(weights))
+        if cumulative_weights[-1] <= 0.0:
+            return allowed_cities[int(self.random.random() * len(allowed_cities))]
+        return allowed_cities[bisect_right(cumulative_weights, self.random.random() * cumulative_weights[-1], 0, len(allowed_cities) - 1)]
+
+    def _get_target_id_vectorized(self, allowed_cities: numpy.ndarray, columns: numpy.ndarray = None) -> int:
+        distances = self._get_distances_to(allowed_cities, columns)
+        zero_distance = numpy.flatnonzero(distances == 0)
+        if len(zero_distance) > 0:
+            return allowed_cities[zero_distance[0]]
+        cumulative_weights = numpy.cumsum(self._get_choice_info(allowed_cities, columns))
+        # Same draw as in _get_target_id, so both engines consume the random stream identically
+        if cumulative_weights[-1] <= 0.0:
+            return allowed_cities[int(self.random.random() * len(allowed_cities))]
+        index = numpy.searchsorted(cumulative_weights, self.random.random() * cumulative_weights[-1], side='right')
+        return allowed_cities[min(index, len(allowed_cities) - 1)]
+
+    def _get_choice_info(self, cities_to: numpy.ndarray, columns: numpy.ndarray = None) -> numpy.ndarray:
+        if not self.sparse:
+            return self._choice_info[self.current_id, cities_to]
+        if columns is not None:
+            return self._choice_info[self.current_id, columns]
+        (columns, found) = self._find_candidate_columns(self.current_id, cities_to)
+        choice_info = self._choice_info[self.current_id, -1] * self.distances[self.current_id, cities_to] ** -self.beta
+        choice_info[found] = self._choice_info[self.current_id, columns[found]]
+        return choice_info
+
+    def _find_candidate_columns(self, cities_from: numpy.ndarray | int, cities_to: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns columns of sparse storage for edges and mask of edges which are stored (lead to candidates)"""
+        # Routes are stored as int32, keys of large instances need 64 bits
+        keys = numpy.asarray(cities_from, dtype=numpy.int64) * len(self.cities) + cities_to
+        positions = numpy.minimum(numpy.searchsorted(self._candidate_keys, keys), len(self._candidate_keys) - 1)
+        return (self._candidate_columns[positions], self._candidate_keys[positions] == keys)
+
+    def _deposit(self, cities_from: numpy.ndarray, cities_to: numpy.ndarray, amounts: numpy.ndarray) -> None:
+        if self.sparse:
+            (columns, found) = self._find_candidate_columns(cities_from, cities_to)
+            (cities_from, cities_to, amounts) = (cities_from[found], columns[found], amounts[found])
+        numpy.add.at(self.pheromones, (cities_from, cities_to), amounts)
+        self._limit_pheromones(cities_from, cities_to)
+        self._update_choice_info(cities_from, cities_to)
+
+    def _limit_pheromones(self, cities_from: numpy.ndarray, cities_to: numpy.ndarray) -> None:
+        """Keeps pheromones of edges which have just been reinforced within limits, they are not limited in Ant System"""
+
+    def _lay_pheromones(self, route: list[int], factor: float = None, route_length: float = None) -> None:
+        if len(route) <= 0:
+            return
+        self._lay_pheromones_batch([route], [route_length], factor)
+
+    def _lay_pheromones_batch(self, routes: list[list[int]], route_lengths: list[float], factor: float = None) -> None:
+        """Lays pheromones on routes of many ants at once, lengths which are not known (None or -1) are calculated"""
         if factor is None:
             factor = self.pheromones_factor
-        if len(route) <= 0:
+        routes_from, routes_to, amounts = [], [], []
+        for route, route_length in zip(routes, route_lengths):
+            route = numpy.asarray(route)
+            not_loop = route[:-1] != route[1:]
+            # Routes without customers have no edges and zero length, so nothing is laid on them
+            if not not_loop.any():
+                continue
+            if route_length is None or route_length < 0:
+                route_length = self._get_route_length(route)
+            routes_from.append(route[:-1][not_loop])
+            routes_to.append(route[1:][not_loop])
+            amounts.append(numpy.full(len(routes_from[-1]), factor / route_length / self.pheromones_scale))
+        if len(routes_from) == 0:
             return
-        for i in range(len(route) - 1):
-            city_from = route[i]
-            city_to = route[i+1]
-            if city_from != city_to:
-                self.pheromones[city_from, city_to] += factor / self._get_route_length(route)
+        self._deposit(numpy.concatenate(routes_from), numpy.concatenate(routes_to), numpy.concatenate(amounts))
+
+    def _lay_colony_pheromones(self) -> None:
+        """Lays pheromones on current routes of all ants at once, straight from the colony blocks
+
+        As in _lay_pheromones_batch, lengths of routes which did not return to the depot (-1) are calculated."""
+        routes = self.colony_routes
+        (cities_from, cities_to) = (routes.current[:, :-1], routes.current[:, 1:])
+        is_edge = (numpy.arange(cities_from.shape[1]) < (routes.current_sizes - 1)[:, numpy.newaxis]) & (cities_from != cities_to)
+        has_edges = is_edge.any(axis=1)
+        route_lengths = routes.current_lengths.copy()
+        for ant_id in numpy.flatnonzero((route_lengths < 0) & has_edges):
+            route_lengths[ant_id] = self._get_route_length(routes.current[ant_id, :routes.current_sizes[ant_id]])
+        # Routes without customers have no edges and zero length, so nothing is laid on them
+        amounts = numpy.divide(self.pheromones_factor, route_lengths, out=numpy.zeros(len(route_lengths)), where=has_edges)
+        amounts = numpy.broadcast_to((amounts / self.pheromones_scale)[:, numpy.newaxis], is_edge.shape)
+        self._deposit(cities_from[is_edge], cities_to[is_edge], amounts[is_edge])
+
+    def _lay_reinforcements(self, reinforcements: list[tuple[RouteEdges, float]]) -> None:
+        """Lays pheromones on edges of routes chosen by pheromones update strategy"""
+        reinforcements = [(edges, weight) for edges, weight in reinforcements if len(edges.cities_from) > 0]
+        if len(reinforcements) == 0:
+            return
+        cities_from = numpy.concatenate([edges.cities_from for edges, _ in reinforcements])
+        cities_to = numpy.concatenate([edges.cities_to for edges, _ in reinforcements])
+        amounts = numpy.concatenate([numpy.full(len(edges.cities_from), weight * self.pheromones_factor / edges.length / self.pheromones_scale)
+                                     for edges, weight in reinforcements])
+        self._deposit(cities_from, cities_to, amounts)
 
     def _update_pheromones(self) -> None:
-        for i in range(len(self.cities)):
-            for j in range(len(self.cities)):
-                if i != j:
-                    self.pheromones[i, j] *= (1 - self.evaporate_factor)
+        self._evaporate_pheromones()
+        self._lay_reinforcements(self.pheromone_update.get_reinforcements(self))
+
+    def _evaporate_pheromones(self) -> None:
+        self.pheromones_scale *= 1 - self.evaporate_factor
+        if self.pheromones_scale < MIN_PHEROMONES_SCALE:
+            self._normalize_pheromones()
+
+    def _normalize_pheromones(self) -> None:
+        numpy.multiply(self.pheromones, self.pheromones_scale, out=self.pheromones, where=self._off_diagonal)
+        self.pheromones_scale = 1.0
+        self._update_choice_info()
+
+    def get_pheromones(self) -> numpy.ndarray:
+        """Returns copy of the pheromones matrix with evaporation applied"""
+        self._ensure_initial_pheromones()
+        pheromones = self.pheromones.copy()
+        numpy.multiply(pheromones, self.pheromones_scale, out=pheromones, where=self._off_diagonal)
+        return pheromones
+
+    def warm_start(self, routes: list[list[int]], factor: float = None) -> None:
+        """Lays pheromones on routes known in advance, e.g. result of HeuristicSolver or solution of a similar request
+
+        Routes have to start and end in depot. By default every route is rewarded as if all ants of an iteration found it.
+        Routes are not taken as the result, as they may be infeasible for the current request."""
+        self._ensure_initial_pheromones()
+        routes = [route for route in routes if len(route) > 1]
+        factor = factor if factor is not None else self.pheromones_factor * self.number_of_ants
+        self._lay_pheromones_batch(routes, [None] * len(routes), factor)
+
+    def blend_pheromones(self, pheromones: numpy.ndarray, weight: float) -> None:
+        """Replaces pheromones with weighted average of the current ones and pheromones given (with weight)"""
+        blended = self.get_pheromones()
+        blended *= 1 - weight
+        blended += weight * pheromones
+        numpy.copyto(self.pheromones, blended)
+        self.pheromones_scale = 1.0
+        self._update_choice_info()
+
+    def save_pheromones(self, path: str) -> None:
+        """Saves pheromones to a .npy file, replacing it only when saving is finished"""
+        temporary_path = path + '.part'
+        with open(temporary_path, 'wb') as file:
+            numpy.save(file, self.get_pheromones())
+        os.replace(temporary_path, path)
+
+    def load_pheromones(self, path: str) -> None:
+        """Replaces pheromones with the snapshot saved by save_pheromones, the file is memory-mapped and copied in place"""
+        self._ensure_initial_pheromones()
+        pheromones = numpy.load(path, mmap_mode='r')
+        if pheromones.shape != self.pheromones.shape:
+            raise ValueError(F'Pheromones snapshot of shape {pheromones.shape} does not match {len(self.cities)} cities')
+        numpy.copyto(self.pheromones, pheromones)
+        self.pheromones_scale = 1.0
+        self._update_choice_info()
+
+    def save_checkpoint(self, path: str) -> None:
+        """Saves pheromones, the best route, trace and state of random generator to directory path"""
+        os.makedirs(path, exist_ok=True)
+        self.save_pheromones(os.path.join(path, CHECKPOINT_PHEROMONES_FILE))
+        temporary_path = os.path.join(path, CHECKPOINT_STATE_FILE + '.part')
+        with open(temporary_path, 'wb') as file:
+            numpy.savez(file, **self._get_checkpoint_state())
+        os.replace(temporary_path, os.path.join(path, CHECKPOINT_STATE_FILE))
+
+    def load_checkpoint(self, path: str) -> None:
+        """Restores state saved by save_checkpoint, the next solve continues from the iteration following the checkpoint"""
+        self.load_pheromones(os.path.join(path, CHECKPOINT_PHEROMONES_FILE))
+        with numpy.load(os.path.join(path, CHECKPOINT_STATE_FILE)) as state:
+            self._set_checkpoint_state(state)
+
+    def _get_checkpoint_state(self) -> dict[str, numpy.ndarray]:
+        return {'route': numpy.array(self.route, dtype=int), 'route_length': numpy.array(float(self.route_length)),
+                'trace': self.trace[:self.trace_size], 'random_state': numpy.array(json.dumps(self.random.get_state()))}
+
+    def _set_checkpoint_state(self, state: numpy.lib.npyio.NpzFile) -> None:
+        route = state['route'].tolist()
+        self.route = route
+        self.route_length = state['route_length'].item() if len(route) > 0 else sys.maxsize
+        self.result = True if len(route) > 0 else None
+        self.trace = state['trace'].copy()
+        self.trace_size = self.start_iteration = len(self.trace)
+        self.random.set_state(json.loads(state['random_state'].item()))
+
+    def _update_choice_info(self, cities_from: list[int] = None, cities_to: list[int] = None) -> None:
+        """Rebuilds cached tau^alpha * eta^beta matrix, or only given edges of it if they are passed"""
+        if cities_from is None:
+            numpy.power(self.pheromones, self.alpha, out=self._choice_info)
+            self._choice_info *= self._weighted_heuristic
+            return
+        self._choice_info[cities_from, cities_to] = (
+            (self.pheromones[cities_from, cities_to] ** self.alpha) * self._weighted_heuristic[cities_from, cities_to])
+
+    @staticmethod
+    def _calculate_heuristic(distances: numpy.ndarray) -> numpy.ndarray:
+        heuristic = numpy.zeros_like(distances)
+        numpy.divide(1, distances, out=heuristic, where=distances != 0)
+        return heuristic
 
 class ElitistACOSolver(ACOSolver):
     """Class implementing a solver for CVRP problem using ACO with elitist ants"""
-    def __init__(self, cities: list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
                 number_of_ants: int, alpha: float, beta: float, pheromones_factor: float, evaporate_factor: float, number_of_iterations: int,
-                number_of_elitist_ants: int) -> None:
+                number_of_elitist_ants: int, pheromone_update: PheromoneUpdate = None, **kwargs) -> None:
         super().__init__(cities, max_capacity, max_range, number_of_trucks, seed,
-                        number_of_ants, alpha, beta, pheromones_factor, evaporate_factor, number_of_iterations)
+                        number_of_ants, alpha, beta, pheromones_factor, evaporate_factor, number_of_iterations,
+                        pheromone_update=pheromone_update if pheromone_update is not None else ElitistUpdate(number_of_elitist_ants), **kwargs)
         self.number_of_elitist_ants = number_of_elitist_ants
 
     def get_algorithm_name(self) -> str:
         return 'Elitist'
 
-    def _update_pheromones(self) -> None:
-        super()._update_pheromones()
-        if len(self.route) > 0:
-            self._lay_pheromones(self.route, self.number_of_elitist_ants * self.pheromones_factor)
-        else:
-            print('No solution so far')
+class MMASSolver(ACOSolver):
+    """Class implementing a solver for CVRP problem using MAX-MIN Ant System
+
+    Pheromones are kept within [tau_min, tau_max]. If limits are not given, tau_max = Q / (rho * L_best)
+    and tau_min = tau_max / (2 * n) are derived from the best route found so far.
+    By default only the best ant of every iteration lays pheromones."""
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
+                number_of_ants: int, alpha: float, beta: float, pheromones_factor: float, evaporate_factor: float, number_of_iterations: int,
+                tau_min: float = None, tau_max: float = None, pheromone_update: PheromoneUpdate = None, **kwargs) -> None:
+        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed,
+                        number_of_ants, alpha, beta, pheromones_factor, evaporate_factor, number_of_iterations,
+                        pheromone_update=pheromone_update if pheromone_update is not None else IterationBestUpdate(), **kwargs)
+        self._fixed_limits = tau_min is not None and tau_max is not None
+        self._limits = (tau_min, tau_max)
+        self.tau_min = tau_min if tau_min is not None else 0.0
+        self.tau_max = tau_max if tau_max is not None else numpy.inf
+        if tau_max is not None:
+            self.initial_pheromones = tau_max
+            self._reset_pheromones()
+
+    def reset(self, demands: numpy.ndarray = None, max_capacity: int = None, max_range: int = None,
+              number_of_trucks: int = None, seed: int = None) -> None:
+        (tau_min, tau_max) = self._limits
+        self.tau_min = tau_min if tau_min is not None else 0.0
+        self.tau_max = tau_max if tau_max is not None else numpy.inf
+        super().reset(demands, max_capacity, max_range, number_of_trucks, seed)
+
+    def get_algorithm_name(self) -> str:
+        return 'MMAS'
+
+    def _evaporate_pheromones(self) -> None:
+        # Evaporation is applied eagerly, as limits are defined on real pheromones values. It only lowers pheromones,
+        # so tau_max is checked here only if it has dropped, later it is checked only on reinforced edges
+        previous_tau_max = self.tau_max
+        self._update_limits()
+        # Loops evaporate and are limited as well, masking them would cost more than it saves as their choice info is zero
+        numpy.multiply(self.pheromones, 1 - self.evaporate_factor, out=self.pheromones)
+        if self.tau_max < previous_tau_max:
+            numpy.minimum(self.pheromones, self.tau_max, out=self.pheromones)
+        numpy.maximum(self.pheromones, self.tau_min, out=self.pheromones)
+        self._update_choice_info()
+
+    def _limit_pheromones(self, cities_from: numpy.ndarray, cities_to: numpy.ndarray) -> None:
+        self.pheromones[cities_from, cities_to] = numpy.minimum(self.pheromones[cities_from, cities_to], self.tau_max)
+
+    def _reset_pheromones(self) -> None:
+        if self.tau_max < numpy.inf:
+            self.initial_pheromones = self.tau_max
+        super()._reset_pheromones()
+
+    def _get_checkpoint_state(self) -> dict[str, numpy.ndarray]:
+        return {**super()._get_checkpoint_state(), 'limits': numpy.array([self.tau_min, self.tau_max])}
+
+    def _set_checkpoint_state(self, state: numpy.lib.npyio.NpzFile) -> None:
+        super()._set_checkpoint_state(state)
+        (self.tau_min, self.tau_max) = state['limits'].tolist()
+
+    def _update_limits(self) -> None:
+        # Limits follow the best route, except for the route without customers which has zero length
+        if self._fixed_limits or not self.result or self.route_length <= 0:
+            return
+        self.tau_max = self.pheromones_factor / (self.evaporate_factor * self.route_length)
+        self.tau_min = self.tau_max / (2 * len(self.cities))
 
 class EnhancedACOSolver(ACOSolver):
-    """Class implementing a solver for CVRP problem using ACO with inversion of subpaths"""
-    def _find_route(self) -> tuple[list[int], float]:
-        (base_route, base_route_length) = super()._find_route()
-        if base_route_length <= 0:
-            return (base_route, base_route_length)
-        return self.__reverse_subpaths(base_route)
+    """Class implementing a solver for CVRP problem using ACO with local search (2-opt, Or-opt, relocate and exchange)
+    applied to the best ants of every iteration"""
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
+                number_of_ants: int, alpha: float, beta: float, pheromones_factor: float, evaporate_factor: float, number_of_iterations: int,
+                local_search_ants: int = 1, **kwargs) -> None:
+        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed,
+                        number_of_ants, alpha, beta, pheromones_factor, evaporate_factor, number_of_iterations,
+                        local_search_ants=local_search_ants, **kwargs)
 
     def get_algorithm_name(self) -> str:
         return 'Enhanced'
 
-    def __reverse_subpaths(self, base_route: list[int]) -> tuple[list[int], float]:
-        best_route, best_length = [0], 0
-        paths = self._split_route(base_route)
-        lengths = [self._get_route_length(path) for path in paths]
-        for i, path in enumerate(paths):
-            if len(path) <= 3:
-                best_route.extend(paths[i][1:])
-                best_length += lengths[i]
-                continue
-            modified_subpath = path
-            for j in range(1, len(path) - 2):
-                for k in range(j + 1, len(path) - 1):
-                    modified_subpath[j], modified_subpath[k] = modified_subpath[k], modified_subpath[j]
-                    modified_subpath_length = self._get_route_length(modified_subpath)
-                    if modified_subpath_length < lengths[i]:
-                        paths[i], lengths[i] = modified_subpath, modified_subpath_length
-            best_route.extend(paths[i][1:])
-            best_length += lengths[i]
-        return (best_route, best_length)
+class _Island:
+    """Colony of IslandSolver, run either in the main process or in a separate one"""
+    def __init__(self, solver_name: str, cities: Cities, demands: numpy.ndarray, max_capacity: int, max_range: int,
+                number_of_trucks: int, seed: int, parameters: dict) -> None:
+        self.colony = globals()[solver_name](cities, max_capacity, max_range, number_of_trucks, seed, **{**parameters, 'number_of_iterations': 0})
+        self.colony.reset(demands)
+
+    def run(self, iterations: int, migrants: list[list[int]], pheromones: numpy.ndarray, blend_factor: float,
+            send_pheromones: bool) -> tuple[list[int], float, numpy.ndarray, numpy.ndarray]:
+        """Applies migration and continues solving for given number of iterations, returns the best route,
+        its length, trace of these iterations and pheromones if they are needed for the next migration"""
+        colony = self.colony
+        if migrants:
+            colony.warm_start(migrants)
+        if pheromones is not None:
+            colony.blend_pheromones(pheromones, blend_factor)
+        first_iteration = colony.trace_size
+        colony.start_iteration = first_iteration
+        colony.number_of_iterations = first_iteration + iterations
+        colony.solve()
+        return (colony.route, colony.route_length, colony.trace[first_iteration:colony.trace_size],
+                colony.get_pheromones() if send_pheromones else None)
+
+def _run_island_process(connection: Connection, arguments: tuple) -> None:
+    island = _Island(*arguments)
+    while (message := connection.recv()) is not None:
+        connection.send(island.run(*message))
+    connection.close()
+
+class IslandSolver(BaseSolver):
+    """Class implementing a solver for CVRP problem running several independent colonies (islands)
+
+    Every island is given as a pair of solver class name and its parameters, so islands may use different strategies
+    and values of alpha and beta. Every migration_interval iterations islands exchange information: with ring migration
+    every island gets the best route of the previous one, with best migration all islands get the best route found so far
+    (migrants are laid as in ACOSolver.warm_start), with pheromones migration pheromones of every island are blended
+    with pheromones of the previous one. If parallel (by default when more than one CPU is available) every island
+    runs in a separate process and communicates over a pipe. Solving stops after number_of_iterations or when
+    time_limit (in seconds) passes, which is checked between migrations."""
+    def __init__(self, cities: Cities | list[City], max_capacity: int, max_range: int, number_of_trucks: int, seed: int,
+                islands: list[tuple[str, dict]], number_of_iterations: int, migration_interval: int = 10,
+                migration: str = RING_MIGRATION, blend_factor: float = 0.5, parallel: bool = None, time_limit: float = None,
+                **kwargs) -> None:
+        super().__init__(cities, max_capacity, max_range, number_of_trucks, seed, **kwargs)
+        if migration not in MIGRATIONS:
+            raise ValueError(F'Unknown migration: {migration}, expected one of {MIGRATIONS}')
+        self.islands = islands
+        self.number_of_iterations = number_of_iterations
+        self.migration_interval = migration_interval
+        self.migration = migration
+        self.blend_factor = blend_factor
+        self.parallel = parallel if parallel is not None else (os.cpu_count() or 1) > 1
+        self.time_limit = time_limit
+        self.island_lengths = []
+        self._island_kwargs = kwargs
+
+    def solve(self, output: str | ResultSink = None) -> None:
+        self._start_trace(self.number_of_iterations, 1)
+        start = timer()
+        connections = []
+        processes = []
+        try:
+            (islands, connections, processes) = self._start_islands()
+            migrants = [None] * len(self.islands)
+            pheromones = [None] * len(self.islands)
+            while self.trace_size < self.number_of_iterations:
+                if self.time_limit is not None and timer() - start > self.time_limit:
+                    break
+                iterations = min(self.migration_interval, self.number_of_iterations - self.trace_size)
+                messages = [(iterations, migrants[i], pheromones[i], self.blend_factor, self.migration == PHEROMONES_MIGRATION)
+                            for i in range(len(self.islands))]
+                if connections:
+                    for connection, message in zip(connections, messages):
+                        connection.send(message)
+                    results = [connection.recv() for connection in connections]
+                else:
+                    results = [island.run(*message) for island, message in zip(islands, messages)]
+                self._record_islands(results, iterations)
+                (migrants, pheromones) = self._migrate(results)
+        finally:
+            self._stop_islands(connections, processes)
+            self.solve_time = (timer() - start) * 1000
+            self._write_result(output)
+
+    def get_algorithm_name(self) -> str:
+        return 'Islands'
+
+    def _start_islands(self) -> tuple[list[_Island], list[Connection], list[Process]]:
+        seeds = [int(seed.generate_state(1)[0]) for seed in numpy.random.SeedSequence(self.seed).spawn(len(self.islands))]
+        arguments = [(solver_name, self.cities, self.demands, self.max_capacity, self.max_range, self.number_of_trucks,
+                      island_seed, {**self._island_kwargs, **parameters})
+                     for (solver_name, parameters), island_seed in zip(self.islands, seeds)]
+        if not self.parallel:
+            return ([_Island(*island_arguments) for island_arguments in arguments], [], [])
+        connections, processes = [], []
+        for island_arguments in arguments:
+            (connection, island_connection) = Pipe()
+            process = Process(target=_run_island_process, args=(island_connection, island_arguments), daemon=True)
+            process.start()
+            island_connection.close()
+            connections.append(connection)
+            processes.append(process)
+        return ([], connections, processes)
+
+    def _stop_islands(self, connections: list[Connection], processes: list[Process]) -> None:
+        for connection in connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            connection.close()
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+
+    def _record_islands(self, results: list[tuple], iterations: int) -> None:
+        traces = []
+        for (route, route_length, trace, _) in results:
+            if len(route) > 0:
+                self._update_result(route, route_length)
+            # Islands which stopped early keep their last best length
+            traces.append(numpy.pad(trace, (0, iterations - len(trace)), mode='edge') if len(trace) > 0 else numpy.zeros(iterations))
+        traces = numpy.where(numpy.array(traces) > 0, traces, numpy.inf)
+        previous = self.trace[self.trace_size - 1] if self.trace_size > 0 and self.trace[self.trace_size - 1] > 0 else numpy.inf
+        for best_length in numpy.minimum.accumulate(numpy.minimum(traces.min(axis=0), previous)).tolist():
+            self.trace[self.trace_size] = best_length if best_length < numpy.inf else 0
+            self.trace_size += 1
+            self._notify_iteration(self.trace_size)
+        self.island_lengths = [float(route_length) if len(route) > 0 else None for (route, route_length, _, _) in results]
+
+    def _migrate(self, results: list[tuple]) -> tuple[list[list[list[int]]], list[numpy.ndarray]]:
+        if self.migration == PHEROMONES_MIGRATION:
+            return ([None] * len(results), [results[i - 1][3] for i in range(len(results))])
+        if self.migration == BEST_MIGRATION:
+            return ([[self.route] if self.result else None] * len(results), [None] * len(results))
+        return ([[results[i - 1][0]] if len(results[i - 1][0]) > 0 else None for i in range(len(results))], [None] * len(results))
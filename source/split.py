@@ -0,0 +1,121 @@
+"""Split decoder cutting giant tours over customers into routes of trucks"""
+from collections import deque
+import numpy
+
+class SplitDecoder:
+    """Class finding the shortest route which visits customers in the order of a giant tour (Split algorithm)
+
+    Without a limit on number of trucks, or when the shortest split needs no more trucks than the limit, trips are
+    chosen in linear time with a deque of non-dominated predecessors. Otherwise a bounded fleet dynamic programme
+    computes the shortest split with k trucks for every k up to number_of_trucks, each layer in linear time as well.
+    Both assume that a trip gets no longer when its first customer is dropped (triangle inequality)."""
+    def __init__(self, distances: numpy.ndarray, demands: numpy.ndarray, max_capacity: int, max_range: int,
+                 number_of_trucks: int = None) -> None:
+        self.distances = distances
+        self.set_request(demands, max_capacity, max_range, number_of_trucks)
+        self._from_depot = []
+        self._to_depot = []
+        self._travelled = []
+        self._loads = []
+
+    def set_request(self, demands: numpy.ndarray, max_capacity: int, max_range: int, number_of_trucks: int = None) -> None:
+        """Replaces demands of customers and limits of trucks, distances stay the same"""
+        self.demands = demands
+        self.max_capacity = max_capacity
+        self.max_range = max_range
+        self.number_of_trucks = number_of_trucks
+
+    def split(self, tour: list[int] | numpy.ndarray) -> tuple[list[int], float]:
+        """Returns the shortest route (with depot between trips) visiting customers in the order of the tour and its length,
+        or ([], -1) if customers cannot be served in this order"""
+        tour = numpy.asarray(tour)
+        if len(tour) == 0:
+            return ([0, 0], 0.0)
+        self._load(tour)
+        trips = self._split_unlimited()
+        if trips is not None and self.number_of_trucks is not None and len(trips) > self.number_of_trucks:
+            trips = self._split_bounded()
+        if trips is None:
+            return ([], -1)
+        route = [0]
+        for start, end in trips:
+            route.extend(tour[start:end].tolist())
+            route.append(0)
+        return (route, float(self.distances[route[:-1], route[1:]].sum()))
+
+    def _load(self, tour: numpy.ndarray) -> None:
+        # Customers of the tour are numbered from 1, trip (i, j] serves customers i + 1 to j
+        self._from_depot = [0.0] + self.distances[0, tour].tolist()
+        self._to_depot = [0.0] + self.distances[tour, 0].tolist()
+        self._travelled = [0.0, 0.0] + numpy.cumsum(self.distances[tour[:-1], tour[1:]]).tolist()
+        self._loads = [0] + numpy.cumsum(self.demands[tour]).tolist()
+
+    def _is_feasible(self, start: int, end: int) -> bool:
+        return (self._loads[end] - self._loads[start] <= self.max_capacity
+                and self._from_depot[start + 1] + self._travelled[end] - self._travelled[start + 1] + self._to_depot[end] <= self.max_range)
+
+    def _get_key(self, costs: list[float], start: int) -> float:
+        # Cost of trip (start, end] is the key of start plus part depending only on end
+        return costs[start] + self._from_depot[start + 1] - self._travelled[start + 1]
+
+    def _split_unlimited(self) -> list[tuple[int, int]]:
+        size = len(self._loads) - 1
+        costs = [0.0] * (size + 1)
+        predecessors = [0] * (size + 1)
+        queue = deque([0])
+        for end in range(1, size + 1):
+            while queue and not self._is_feasible(queue[0], end):
+                queue.popleft()
+            if not queue:
+                return None
+            costs[end] = self._get_key(costs, queue[0]) + self._travelled[end] + self._to_depot[end]
+            predecessors[end] = queue[0]
+            if end < size:
+                # Later start is feasible whenever the earlier one is, so it dominates it if its key is not greater
+                key = self._get_key(costs, end)
+                while queue and key <= self._get_key(costs, queue[-1]):
+                    queue.pop()
+                queue.append(end)
+        return self._get_trips([predecessors])
+
+    def _split_bounded(self) -> list[tuple[int, int]]:
+        size = len(self._loads) - 1
+        costs = [0.0] + [numpy.inf] * size
+        layers = []
+        (best_cost, best_layer) = (numpy.inf, None)
+        for layer in range(self.number_of_trucks):
+            (costs, predecessors) = self._split_layer(costs)
+            layers.append(predecessors)
+            if costs[size] < best_cost:
+                (best_cost, best_layer) = (costs[size], layer)
+            if all(cost == numpy.inf for cost in costs):
+                break
+        return self._get_trips(layers[:best_layer + 1]) if best_layer is not None else None
+
+    def _split_layer(self, previous_costs: list[float]) -> tuple[list[float], list[int]]:
+        size = len(self._loads) - 1
+        costs = [numpy.inf] * (size + 1)
+        predecessors = [-1] * (size + 1)
+        queue = deque()
+        for end in range(1, size + 1):
+            if previous_costs[end - 1] < numpy.inf:
+                key = self._get_key(previous_costs, end - 1)
+                while queue and key <= self._get_key(previous_costs, queue[-1]):
+                    queue.pop()
+                queue.append(end - 1)
+            while queue and not self._is_feasible(queue[0], end):
+                queue.popleft()
+            if queue:
+                costs[end] = self._get_key(previous_costs, queue[0]) + self._travelled[end] + self._to_depot[end]
+                predecessors[end] = queue[0]
+        return (costs, predecessors)
+
+    def _get_trips(self, layers: list[list[int]]) -> list[tuple[int, int]]:
+        # With a single layer predecessors of the same layer are followed, otherwise every trip comes from the layer before
+        trips = []
+        (end, layer) = (len(self._loads) - 1, len(layers) - 1)
+        while end > 0:
+            start = layers[layer][end]
+            trips.append((start, end))
+            (end, layer) = (start, max(layer - 1, 0))
+        return trips[::-1]
@@ -0,0 +1,110 @@
+"""Runner of parameter sweeps, solving every combination of tests, solvers, parameters and seeds in parallel"""
+from collections import defaultdict
+from functools import partial
+import itertools
+from multiprocessing import Pool
+import os
+from typing import Any, Callable, NamedTuple
+from results import ResultSink, SolverResult, TextSink
+import solver as solver_module
+from testset_parser import CVRPTestParser, TestData
+
+class Sweep:
+    """Class describing a grid of runs
+
+    Every parameter value may be a list of values to sweep over, or a callable returning value (or list of values)
+    for given TestData. Parameters not accepted by a solver are not passed to it. file_name is formatted with
+    test, seed, solver (class name), algorithm (name returned by solver) and values of parameters accepted by the solver."""
+    def __init__(self, file_name: str, tests: list[str], seeds: list[int], solvers: list[str],
+                parameters: dict[str, Any | list[Any] | Callable[[TestData], Any]]) -> None:
+        self.file_name = file_name
+        self.tests = tests
+        self.seeds = seeds
+        self.solvers = solvers
+        self.parameters = parameters
+
+class SweepJob(NamedTuple):
+    """Single run of a sweep"""
+    test: str
+    solver: str
+    parameters: dict[str, Any]
+    seed: int
+    file_path: str
+
+    def describe(self, swept: list[str]) -> str:
+        """Returns description of the job including values of swept parameters"""
+        values = ''.join(F', {name}={self.parameters[name]}' for name in swept if name in self.parameters)
+        return F'test={self.test}, seed={self.seed}, method={self.solver}{values}'
+
+_test_sets = {}
+
+def _get_test_set(test: str) -> TestData:
+    if test not in _test_sets:
+        _test_sets[test] = CVRPTestParser.parse(test)
+    return _test_sets[test]
+
+def _get_algorithm_name(solver_class: type) -> str:
+    return solver_class.__new__(solver_class).get_algorithm_name()
+
+def get_jobs(sweep: Sweep, output_directory: str = '.') -> tuple[list[SweepJob], list[str]]:
+    """Expands sweep into list of jobs and returns it with names of swept parameters"""
+    jobs, swept = [], []
+    for test in sweep.tests:
+        test_set = _get_test_set(test)
+        values = {}
+        for name, value in sweep.parameters.items():
+            value = value(test_set) if callable(value) else value
+            values[name] = value if isinstance(value, list) else [value]
+            if isinstance(value, list) and name not in swept:
+                swept.append(name)
+        for seed in sweep.seeds:
+            for solver_name in sweep.solvers:
+                solver_class = getattr(solver_module, solver_name)
+                accepted = solver_module.get_accepted_parameters(solver_class)
+                names = [name for name in values if name in accepted]
+                for combination in itertools.product(*(values[name] for name in names)):
+                    parameters = dict(zip(names, combination))
+                    fields = defaultdict(str, test=test, seed=seed, solver=solver_name,
+                                         algorithm=_get_algorithm_name(solver_class), **parameters)
+                    file_name = sweep.file_name.format_map(fields)
+                    jobs.append(SweepJob(test, solver_name, parameters, seed, os.path.join(output_directory, file_name)))
+    if len({job.file_path for job in jobs}) < len(jobs):
+        raise ValueError(F'File name {sweep.file_name} does not distinguish all jobs of the sweep')
+    return (jobs, swept)
+
+def run_job(job: SweepJob, write_file: bool = True) -> tuple[SweepJob, SolverResult]:
+    """Solves a single job and returns its result, storing it in text file if needed
+
+    Test data is parsed once per process."""
+    test_set = _get_test_set(job.test)
+    parameters = {'max_capacity': test_set.capacity, 'number_of_trucks': test_set.truck_count, **job.parameters}
+    solver = getattr(solver_module, job.solver)(test_set.cities, seed=job.seed, **parameters)
+    solver.solve()
+    result = solver.get_result()
+    result.target = test_set.optimal
+    result.metadata = {'key': os.path.basename(job.file_path), 'test': job.test, 'solver': job.solver, 'seed': job.seed, **job.parameters}
+    if write_file:
+        temporary_path = job.file_path + '.part'
+        if os.path.isfile(temporary_path):
+            os.remove(temporary_path)
+        TextSink(temporary_path, test_set.optimal).write(result)
+        os.replace(temporary_path, job.file_path)
+    return (job, result)
+
+def run_sweep(sweep: Sweep, output_directory: str = '.', number_of_workers: int = None, sink: ResultSink = None) -> None:
+    """Runs all jobs of the sweep on a process pool, skipping jobs which results already exist
+
+    By default every job is stored in a separate text file, if sink is given all results are written to it instead."""
+    (jobs, swept) = get_jobs(sweep, output_directory)
+    if sink is None:
+        pending = [job for job in jobs if not os.path.isfile(job.file_path)]
+    else:
+        keys = sink.get_keys()
+        pending = [job for job in jobs if os.path.basename(job.file_path) not in keys]
+    if len(pending) < len(jobs):
+        print(F'Skipping {len(jobs) - len(pending)} of {len(jobs)} already solved jobs')
+    with Pool(number_of_workers) as pool:
+        for (job, result) in pool.imap_unordered(partial(run_job, write_file=sink is None), pending):
+            if sink is not None:
+                sink.write(result)
+            print(F'Solved for {job.describe(swept)}')
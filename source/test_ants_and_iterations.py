@@ -1,6 +1,5 @@
 """Test file for comparing different numbers of ants and iterations"""
-from solver import ACOSolver
-from testset_parser import CVRPTestParser
+from sweep import Sweep, run_sweep
 
 MAX_RANGE = 300
 ALPHA = 1
@@ -14,17 +13,15 @@ def main() -> None:
     tests = ['A-n32-k5', 'A-n45-k7', 'A-n60-k9']
     seeds = [11174, 203019, 473, 22087, 121769]
 
-    for test in tests:
-        for seed in seeds:
-            test_set = CVRPTestParser.parse(test)
-            number_of_cities = len(test_set.cities)
-            for number_of_ants in [number_of_cities // 8, number_of_cities // 4, number_of_cities // 3, number_of_cities // 2, number_of_cities]:
-                file_path = F'nm-{test}-{seed}-{number_of_ants}-out.txt'
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(F'Target: {test_set.optimal}\n')
-                solver = ACOSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed, number_of_ants, ALPHA, BETA, PHEROMONES_FACTOR, EVAPORATE_FACTOR, NUMBER_OF_ITERATIONS)
-                solver.solve(file_path)
-                print(F'Solved for test={test}, seed={seed}, number_of_ants={number_of_ants}')
+    run_sweep(Sweep('nm-{test}-{seed}-{number_of_ants}-out.txt', tests, seeds, ['ACOSolver'], {
+        'max_range': MAX_RANGE,
+        'number_of_ants': lambda test_set: [len(test_set.cities) // divider for divider in [8, 4, 3, 2, 1]],
+        'alpha': ALPHA,
+        'beta': BETA,
+        'pheromones_factor': PHEROMONES_FACTOR,
+        'evaporate_factor': EVAPORATE_FACTOR,
+        'number_of_iterations': NUMBER_OF_ITERATIONS
+    }))
 
 if __name__ == '__main__':
     main()
@@ -1,6 +1,5 @@
 """Test file for comparing all implemented algorithms"""
-from solver import ACOSolver, ElitistACOSolver, EnhancedACOSolver, HeuristicSolver
-from testset_parser import CVRPTestParser
+from sweep import Sweep, run_sweep
 
 MAX_RANGE = 300
 NUMBER_OF_ITERATIONS = 200
@@ -13,24 +12,18 @@ def main() -> None:
     """Test method comparing all implemented methods"""
     tests = ['A-n32-k5', 'A-n39-k5', 'A-n45-k7', 'A-n53-k7', 'A-n60-k9']
     seeds = [11174, 203019, 473, 22087, 121769]
+    solvers = ['ACOSolver', 'ElitistACOSolver', 'EnhancedACOSolver', 'HeuristicSolver']
 
-    for test in tests:
-        for seed in seeds:
-            test_set = CVRPTestParser.parse(test)
-            number_of_ants = len(test_set.cities)
-            number_of_elitist = len(test_set.cities) // 6
-            solvers = [
-                ACOSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed, number_of_ants, ALPHA, BETA, PHEROMONES_FACTOR, EVAPORATE_FACTOR, NUMBER_OF_ITERATIONS),
-                ElitistACOSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed, number_of_ants, ALPHA, BETA, PHEROMONES_FACTOR, EVAPORATE_FACTOR, NUMBER_OF_ITERATIONS, number_of_elitist),
-                EnhancedACOSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed, number_of_ants, ALPHA, BETA, PHEROMONES_FACTOR, EVAPORATE_FACTOR, NUMBER_OF_ITERATIONS),
-                HeuristicSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed)
-            ]
-            for solver in solvers:
-                file_path = F'compare-{test}-{seed}-{solver.get_algorithm_name()}-out.txt'
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(F'Target: {test_set.optimal}\n')
-                solver.solve(file_path)
-                print(F'Solved for test={test}, seed={seed}, method={solver.get_algorithm_name()}')
+    run_sweep(Sweep('compare-{test}-{seed}-{algorithm}-out.txt', tests, seeds, solvers, {
+        'max_range': MAX_RANGE,
+        'number_of_ants': lambda test_set: len(test_set.cities),
+        'alpha': ALPHA,
+        'beta': BETA,
+        'pheromones_factor': PHEROMONES_FACTOR,
+        'evaporate_factor': EVAPORATE_FACTOR,
+        'number_of_iterations': NUMBER_OF_ITERATIONS,
+        'number_of_elitist_ants': lambda test_set: len(test_set.cities) // 6
+    }))
 
 if __name__ == '__main__':
     main()
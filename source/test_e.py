@@ -1,6 +1,5 @@
 """Test file for comparing different numbers of elitist ants"""
-from solver import ElitistACOSolver
-from testset_parser import CVRPTestParser
+from sweep import Sweep, run_sweep
 
 MAX_RANGE = 300
 NUMBER_OF_ITERATIONS = 200
@@ -15,17 +14,16 @@ def main() -> None:
     seeds = [11174, 203019, 473, 22087, 121769]
     elitist = [6, 7, 8, 9, 10]
 
-    for test in tests:
-        for seed in seeds:
-            test_set = CVRPTestParser.parse(test)
-            number_of_ants = len(test_set.cities)
-            for elitist_number in elitist:
-                file_path = F'e-{test}-{seed}-{elitist_number}-out.txt'
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(F'Target: {test_set.optimal}\n')
-                solver = ElitistACOSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed, number_of_ants, ALPHA, BETA, PHEROMONES_FACTOR, EVAPORATE_FACTOR, NUMBER_OF_ITERATIONS, elitist_number)
-                solver.solve(file_path)
-                print(F'Solved for test={test}, seed={seed}, e={elitist_number}')
+    run_sweep(Sweep('e-{test}-{seed}-{number_of_elitist_ants}-out.txt', tests, seeds, ['ElitistACOSolver'], {
+        'max_range': MAX_RANGE,
+        'number_of_ants': lambda test_set: len(test_set.cities),
+        'alpha': ALPHA,
+        'beta': BETA,
+        'pheromones_factor': PHEROMONES_FACTOR,
+        'evaporate_factor': EVAPORATE_FACTOR,
+        'number_of_iterations': NUMBER_OF_ITERATIONS,
+        'number_of_elitist_ants': elitist
+    }))
 
 if __name__ == '__main__':
     main()
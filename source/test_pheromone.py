@@ -1,6 +1,5 @@
 """Test file for comparing different values of pheromones factor"""
-from solver import ACOSolver
-from testset_parser import CVRPTestParser
+from sweep import Sweep, run_sweep
 
 MAX_RANGE = 300
 NUMBER_OF_ITERATIONS = 200
@@ -14,17 +13,15 @@ def main() -> None:
     seeds = [11174, 203019, 473, 22087, 121769]
     q_factors = [0.5, 1, 5, 10, 15, 20]
 
-    for test in tests[1:]:
-        for seed in seeds:
-            test_set = CVRPTestParser.parse(test)
-            number_of_ants = len(test_set.cities)
-            for q_factor in q_factors:
-                file_path = F'q-{test}-{seed}-{q_factor}-out.txt'
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(F'Target: {test_set.optimal}\n')
-                solver = ACOSolver(test_set.cities, test_set.capacity, MAX_RANGE, test_set.truck_count, seed, number_of_ants, ALPHA, BETA, q_factor, EVAPORATE_FACTOR, NUMBER_OF_ITERATIONS)
-                solver.solve(file_path)
-                print(F'Solved for test={test}, seed={seed}, q={q_factor}')
+    run_sweep(Sweep('q-{test}-{seed}-{pheromones_factor}-out.txt', tests[1:], seeds, ['ACOSolver'], {
+        'max_range': MAX_RANGE,
+        'number_of_ants': lambda test_set: len(test_set.cities),
+        'alpha': ALPHA,
+        'beta': BETA,
+        'pheromones_factor': q_factors,
+        'evaporate_factor': EVAPORATE_FACTOR,
+        'number_of_iterations': NUMBER_OF_ITERATIONS
+    }))
 
 if __name__ == '__main__':
     main()
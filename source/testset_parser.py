@@ -1,10 +1,29 @@
 """Utilities for handling input test files"""
+import hashlib
+import math
+import os
 import re
-from city import City
+import shutil
+import tempfile
+from typing import Iterable
+import numpy
+from city import Cities
+
+TESTSETS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'testsets')
+CACHE_DIRECTORY_NAME = '.cache'
+MAX_CACHED_DISTANCES_SIZE = 5000
+HASH_CHUNK_SIZE = 1 << 20
+SECTIONS = ('NODE_COORD_SECTION', 'DEMAND_SECTION', 'DEPOT_SECTION', 'EDGE_WEIGHT_SECTION', 'DISPLAY_DATA_SECTION')
+
+def _to_number(value: str) -> int | float:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
 
 class TestData:
     """Class representing testcase data parsed from input files"""
-    def __init__(self, truck_count: int, capacity: int, cities: list[City], optimal: float, solution: list[list[int]]) -> None:
+    def __init__(self, truck_count: int, capacity: int, cities: Cities, optimal: float, solution: list[list[int]]) -> None:
         self.truck_count = truck_count
         self.capacity = capacity
         self.cities = cities
@@ -22,28 +41,165 @@ Optimal value: {self.optimal}
 Optimal:{solution}'''
 
 class CVRPTestParser:
-    """Class parsing testcase files to TestData"""
+    """Class parsing testcase files in TSPLIB/CVRPLIB format to TestData
+
+    Parsed instances are cached next to the test files, in a directory named after the hash of their content,
+    so parsing the same instance again only maps cached arrays (including distances matrix) into memory.
+    Distances matrix is not cached for instances with positions of more than MAX_CACHED_DISTANCES_SIZE cities,
+    which are meant to be solved with sparse storage."""
     @classmethod
-    def parse(cls, test_name: str) -> TestData:
-        """Static method for parsing test files into instance of TestData class"""
-        test_path = 'testsets/' + test_name
-        with open(test_path + '.vrp', 'r', encoding='utf-8') as test_file:
-            test_content = test_file.read()
-            truck_count = re.search(r"No of trucks: (\d+)", test_content, re.MULTILINE).group(1)
-            capacity = re.search(r"^\s?CAPACITY\s?: (\d+)\s?$", test_content, re.MULTILINE).group(1)
-            positions = re.findall(r"^\s?(\d+) (\d+) (\d+)\s?$", test_content, re.MULTILINE)
-            demand = re.findall(r"^\s?(\d+) (\d+)\s?$", test_content, re.MULTILINE)
-            cities = []
-            for position in positions:
-                for dem in demand:
-                    if position[0] == dem[0]:
-                        cities.append(City(int(position[1]), int(position[2]), int(dem[1])))
-
-        with open(test_path + '.sol', 'r', encoding='utf-8') as solution_file:
-            solution_content = solution_file.read()
-            optimal = re.search(r"Cost (\d+)", solution_content, re.MULTILINE).group(1)
-            raw_sol = re.findall(r"^\s?Route #(\d+)\s?:\s?(.*)\s?$", solution_content, re.MULTILINE)
-            paths = [[int(vertex) for vertex in unparsed[1].split()] for unparsed in raw_sol]
-
-        test_data = TestData(int(truck_count), int(capacity), cities, int(optimal), paths)
+    def parse(cls, test_name: str, directory: str = TESTSETS_DIRECTORY, use_cache: bool = True) -> TestData:
+        """Static method for parsing test files into instance of TestData class
+
+        test_name is either a name of the test in directory or a path to the test file, with or without .vrp extension.
+        Solution file (.sol) is optional."""
+        test_path = test_name[:-4] if test_name.endswith('.vrp') else test_name
+        if not os.path.dirname(test_path):
+            test_path = os.path.join(directory, test_path)
+        solution_path = test_path + '.sol' if os.path.isfile(test_path + '.sol') else None
+        if not use_cache:
+            return cls._parse_files(test_path + '.vrp', solution_path)
+
+        content_hash = cls._get_content_hash(test_path + '.vrp', solution_path)
+        cache_path = os.path.join(os.path.dirname(test_path), CACHE_DIRECTORY_NAME, F'{os.path.basename(test_path)}-{content_hash}')
+        if os.path.isdir(cache_path):
+            return cls._load_cache(cache_path)
+        test_data = cls._parse_files(test_path + '.vrp', solution_path)
+        cls._save_cache(test_data, cache_path)
         return test_data
+
+    @staticmethod
+    def _get_content_hash(test_path: str, solution_path: str) -> str:
+        # Files are hashed in chunks, as content of the test file followed by zero byte and content of the solution file
+        content_hash = hashlib.sha256()
+        for (path, separator) in ((test_path, b'\0'), (solution_path, b'')):
+            if path is not None:
+                with open(path, 'rb') as file:
+                    while chunk := file.read(HASH_CHUNK_SIZE):
+                        content_hash.update(chunk)
+            content_hash.update(separator)
+        return content_hash.hexdigest()[:16]
+
+    @classmethod
+    def _parse_files(cls, test_path: str, solution_path: str) -> TestData:
+        # Files are parsed line by line, without reading their whole content into memory
+        with open(test_path, 'r', encoding='utf-8') as test_file:
+            if solution_path is None:
+                return cls._parse_content(test_file, None)
+            with open(solution_path, 'r', encoding='utf-8') as solution_file:
+                return cls._parse_content(test_file, solution_file)
+
+    @classmethod
+    def _parse_content(cls, test_lines: Iterable[str], solution_lines: Iterable[str]) -> TestData:
+        header = {}
+        nodes, demands, depots, weights = {}, {}, [], []
+        section = None
+        for line in test_lines:
+            line = line.strip()
+            if not line:
+                continue
+            keyword = line.split(':', 1)[0].strip() if ':' in line else line.split()[0]
+            if keyword in SECTIONS:
+                section = keyword
+            elif keyword == 'EOF':
+                break
+            elif section is None or (':' in line and not line[0].isdigit() and line[0] != '-'):
+                section = None
+                header[keyword] = line.split(':', 1)[1].strip()
+            elif section == 'NODE_COORD_SECTION':
+                (node, x_pos, y_pos) = line.split()[:3]
+                nodes[int(node)] = (_to_number(x_pos), _to_number(y_pos))
+            elif section == 'DEMAND_SECTION':
+                (node, demand) = line.split()[:2]
+                demands[int(node)] = int(demand)
+            elif section == 'DEPOT_SECTION':
+                depots.extend(int(value) for value in line.split() if int(value) >= 0)
+            elif section == 'EDGE_WEIGHT_SECTION':
+                weights.extend(float(value) for value in line.split())
+
+        ids = sorted(demands)
+        depot = depots[0] if depots else ids[0]
+        ids.remove(depot)
+        ids.insert(0, depot)
+        capacity = int(header['CAPACITY'])
+        demands = numpy.array([demands[node] for node in ids])
+        if header.get('EDGE_WEIGHT_TYPE', 'EUC_2D') == 'EXPLICIT':
+            order = numpy.array(ids) - min(ids)
+            distances = cls._get_explicit_distances(weights, len(ids), header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX'))
+            cities = Cities(None, demands, distances[numpy.ix_(order, order)])
+        else:
+            cities = Cities(numpy.array([nodes[node] for node in ids]), demands)
+
+        truck_count = re.search(r"No of trucks: (\d+)", header.get('COMMENT', ''))
+        truck_count = re.search(r"-k(\d+)", header.get('NAME', '')) if truck_count is None else truck_count
+        truck_count = int(truck_count.group(1)) if truck_count else math.ceil(demands.sum() / capacity)
+        (optimal, paths) = cls._parse_solution(solution_lines) if solution_lines is not None else (None, [])
+        return TestData(truck_count, capacity, cities, optimal, paths)
+
+    @staticmethod
+    def _get_explicit_distances(weights: list[float], size: int, edge_weight_format: str) -> numpy.ndarray:
+        weights = numpy.array(weights)
+        if edge_weight_format == 'FULL_MATRIX':
+            return weights.reshape(size, size)
+        distances = numpy.zeros((size, size))
+        if edge_weight_format in ('LOWER_ROW', 'UPPER_COL'):
+            indices = numpy.tril_indices(size, -1)
+        elif edge_weight_format in ('LOWER_DIAG_ROW', 'UPPER_DIAG_COL'):
+            indices = numpy.tril_indices(size)
+        elif edge_weight_format in ('UPPER_ROW', 'LOWER_COL'):
+            indices = numpy.triu_indices(size, 1)
+        elif edge_weight_format in ('UPPER_DIAG_ROW', 'LOWER_DIAG_COL'):
+            indices = numpy.triu_indices(size)
+        else:
+            raise ValueError(F'Unsupported edge weight format: {edge_weight_format}')
+        distances[indices] = weights[:len(indices[0])]
+        return numpy.maximum(distances, distances.T)
+
+    @staticmethod
+    def _parse_solution(solution_lines: Iterable[str]) -> tuple[float, list[list[int]]]:
+        optimal, paths = None, []
+        for line in solution_lines:
+            route = re.match(r"^\s?Route #(\d+)\s?:\s?(.*)\s?$", line)
+            if route:
+                paths.append([int(vertex) for vertex in route.group(2).split()])
+            cost = re.match(r"^\s?Cost (\d+(\.\d+)?)", line)
+            if cost:
+                optimal = float(cost.group(1)) if cost.group(2) else int(cost.group(1))
+        return (optimal, paths)
+
+    @staticmethod
+    def _save_cache(test_data: TestData, cache_path: str) -> None:
+        cache_directory = os.path.dirname(cache_path)
+        os.makedirs(cache_directory, exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=cache_directory)
+        # Temporary directories are private, the cache is shared like the directory holding it
+        os.chmod(temporary_path, os.stat(cache_directory).st_mode & 0o777)
+        solution = test_data.solution
+        numpy.savez(os.path.join(temporary_path, 'instance.npz'),
+                    positions=test_data.cities.positions, demands=test_data.cities.demands,
+                    header=numpy.array([test_data.truck_count, test_data.capacity,
+                                        numpy.nan if test_data.optimal is None else test_data.optimal], dtype=float),
+                    solution=numpy.array([vertex for path in solution for vertex in path], dtype=int),
+                    solution_lengths=numpy.array([len(path) for path in solution], dtype=int))
+        explicit = numpy.isnan(test_data.cities.positions).all()
+        if explicit or len(test_data.cities) <= MAX_CACHED_DISTANCES_SIZE:
+            numpy.save(os.path.join(temporary_path, 'distances.npy'), test_data.cities.get_distances())
+        try:
+            os.rename(temporary_path, cache_path)
+        except OSError:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+    @staticmethod
+    def _load_cache(cache_path: str) -> TestData:
+        with numpy.load(os.path.join(cache_path, 'instance.npz')) as instance:
+            (truck_count, capacity, optimal) = instance['header'].tolist()
+            optimal = None if math.isnan(optimal) else (int(optimal) if optimal.is_integer() else optimal)
+            vertices = instance['solution'].tolist()
+            offsets = numpy.cumsum([0] + instance['solution_lengths'].tolist()).tolist()
+            paths = [vertices[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+            positions = instance['positions']
+            demands = instance['demands']
+        distances_path = os.path.join(cache_path, 'distances.npy')
+        distances = numpy.load(distances_path, mmap_mode='r') if os.path.isfile(distances_path) else None
+        positions = None if numpy.isnan(positions).all() else positions
+        return TestData(int(truck_count), int(capacity), Cities(positions, demands, distances), optimal, paths)
@@ -0,0 +1,5 @@
+"""Makes modules of source importable by tests"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source'))
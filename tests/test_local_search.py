@@ -0,0 +1,85 @@
+"""Tests of local search keeping paths within limits of trucks"""
+import numpy
+import pytest
+from local_search import LocalSearch
+
+def _get_instance(seed: int) -> tuple[numpy.ndarray, numpy.ndarray, int, float, list[int]]:
+    """Returns random instance together with a feasible route, paths built greedily from random order of customers"""
+    generator = numpy.random.default_rng(seed)
+    number_of_customers = int(generator.integers(8, 30))
+    positions = generator.uniform(0, 100, (number_of_customers + 1, 2))
+    distances = numpy.hypot(*(positions[:, numpy.newaxis] - positions[numpy.newaxis]).transpose(2, 0, 1))
+    demands = numpy.concatenate(([0], generator.integers(1, 10, number_of_customers)))
+    max_capacity = int(generator.integers(15, 40))
+    max_range = float(2 * distances[0].max() * generator.uniform(1.05, 1.6))
+    route = [0]
+    (load, length) = (0, 0.0)
+    for customer in generator.permutation(numpy.arange(1, number_of_customers + 1)).tolist():
+        closed_length = length + distances[route[-1], customer] + distances[customer, 0]
+        if route[-1] != 0 and (load + demands[customer] > max_capacity or closed_length > max_range):
+            route.append(0)
+            (load, length) = (0, 0.0)
+        length += distances[route[-1], customer]
+        load += demands[customer]
+        route.append(customer)
+    route.append(0)
+    return (distances, demands, max_capacity, max_range, route)
+
+def _get_neighbours(distances: numpy.ndarray, size: int) -> numpy.ndarray:
+    customer_distances = distances.copy()
+    customer_distances[:, 0] = numpy.inf
+    numpy.fill_diagonal(customer_distances, numpy.inf)
+    return numpy.argsort(customer_distances, axis=1)[:, :size]
+
+def _split(route: list[int]) -> list[list[int]]:
+    paths = [[]]
+    for city in route[1:]:
+        if city == 0:
+            paths.append([])
+        else:
+            paths[-1].append(city)
+    return [path for path in paths if path]
+
+def _assert_within_limits(route: list[int], distances: numpy.ndarray, demands: numpy.ndarray, max_capacity: int, max_range: float) -> None:
+    for path in _split(route):
+        stops = [0] + path + [0]
+        assert demands[path].sum() <= max_capacity
+        assert distances[stops[:-1], stops[1:]].sum() <= max_range + 1e-9
+
+@pytest.mark.parametrize('seed', range(300))
+def test_improve_keeps_paths_within_limits(seed: int) -> None:
+    (distances, demands, max_capacity, max_range, route) = _get_instance(seed)
+    _assert_within_limits(route, distances, demands, max_capacity, max_range)
+    (improved_route, improved_length) = LocalSearch(distances, demands, max_capacity, max_range, _get_neighbours(distances, 6)).improve(route)
+    _assert_within_limits(improved_route, distances, demands, max_capacity, max_range)
+    assert sorted(city for city in improved_route if city != 0) == sorted(city for city in route if city != 0)
+    assert improved_length == pytest.approx(distances[improved_route[:-1], improved_route[1:]].sum())
+    assert improved_length <= distances[route[:-1], route[1:]].sum() + 1e-9
+
+def test_segment_moved_to_other_path_counts_its_internal_edges() -> None:
+    # Moving segment 3-4 after customer 1 is shorter in total, but the first path would exceed the range with its internal edge
+    positions = numpy.array([[18, 13], [17, 3], [15, 18], [0, 7], [12, 2]], dtype=float)
+    distances = numpy.hypot(*(positions[:, numpy.newaxis] - positions[numpy.newaxis]).transpose(2, 0, 1))
+    demands = numpy.array([0, 1, 1, 1, 1])
+    route = [0, 1, 0, 2, 3, 4, 0]
+    max_range = 50.0
+    local_search = LocalSearch(distances, demands, 10, max_range, _get_neighbours(distances, 3))
+    local_search._load(route)
+    local_search._try_or_opt(3)
+    for path, length in zip(local_search._paths, local_search._lengths):
+        stops = [0] + path + [0]
+        assert length == pytest.approx(distances[stops[:-1], stops[1:]].sum())
+        assert length <= max_range
+    (improved_route, _) = local_search.improve(route)
+    _assert_within_limits(improved_route, distances, demands, 10, max_range)
+
+def test_reversing_moves_are_skipped_for_asymmetric_distances() -> None:
+    generator = numpy.random.default_rng(1)
+    distances = generator.uniform(1, 100, (12, 12))
+    numpy.fill_diagonal(distances, 0)
+    demands = numpy.ones(12, dtype=int)
+    route = [0] + list(range(1, 12)) + [0]
+    length = distances[route[:-1], route[1:]].sum()
+    (improved_route, improved_length) = LocalSearch(distances, demands, 100, 10 ** 9, _get_neighbours(distances, 11), symmetric=False).improve(route)
+    assert improved_length == pytest.approx(distances[improved_route[:-1], improved_route[1:]].sum())
+    assert improved_length <= length
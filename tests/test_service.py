@@ -0,0 +1,27 @@
+"""Tests of the solver service reusing solvers between requests"""
+import numpy
+import pytest
+from service import SolveRequest, SolverService
+from testset_parser import CVRPTestParser
+
+PARAMETERS = {'number_of_ants': 10, 'number_of_elitist_ants': 2, 'alpha': 1, 'beta': 7, 'pheromones_factor': 20, 'evaporate_factor': 0.4, 'number_of_iterations': 2}
+
+@pytest.fixture(scope='module')
+def test_data():
+    return CVRPTestParser.parse('A-n32-k5')
+
+@pytest.mark.parametrize('solver', ['HeuristicSolver', 'SavingsSolver', 'SweepSolver'])
+def test_default_parameters_not_accepted_by_solver_are_ignored(test_data, solver: str) -> None:
+    service = SolverService(test_data.cities, parameters=PARAMETERS)
+    request = SolveRequest(test_data.cities.demands, test_data.capacity, 10 ** 9, test_data.truck_count, 1, solver=solver)
+    (result,) = service.solve_batch([request])
+    assert result.route_length > 0
+    assert sorted(set(result.route)) == list(range(len(test_data.cities)))
+
+@pytest.mark.parametrize('solver', ['HeuristicSolver', 'SavingsSolver', 'SweepSolver', 'ACOSolver', 'ElitistACOSolver', 'MMASSolver',
+                                    'EnhancedACOSolver'])
+@pytest.mark.parametrize('construction', ['routes', 'giant_tour'])
+def test_request_without_customers_gives_empty_route(test_data, solver: str, construction: str) -> None:
+    service = SolverService(test_data.cities, solver, {**PARAMETERS, 'construction': construction})
+    result = service.solve(numpy.zeros_like(test_data.cities.demands), test_data.capacity, 10 ** 9, test_data.truck_count, 1)
+    assert (result.route, result.route_length) == ([0, 0], 0.0)
@@ -0,0 +1,82 @@
+"""Tests of guarantees given by ACO solvers: deposits, limits, time, instrumentation, engines and workers"""
+import time
+import numpy
+import pytest
+from solver import ENGINES, ACOSolver, EnhancedACOSolver, MMASSolver
+from testset_parser import CVRPTestParser
+
+@pytest.fixture(scope='module')
+def test_data():
+    return CVRPTestParser.parse('A-n32-k5')
+
+def _get_edges(routes: list[numpy.ndarray]) -> list[tuple[int, int]]:
+    edges = []
+    for route in routes:
+        edges.extend((city_from, city_to) for city_from, city_to in zip(route[:-1].tolist(), route[1:].tolist()) if city_from != city_to)
+    return sorted(edges)
+
+@pytest.mark.parametrize('synchronous', [False, True])
+def test_improved_routes_are_deposited(test_data, synchronous: bool) -> None:
+    solver = EnhancedACOSolver(test_data.cities, test_data.capacity, 10 ** 9, test_data.truck_count, 1, 10, 1, 7, 20, 0.4, 1,
+                               local_search_ants=3, synchronous=synchronous, number_of_workers=1)
+    deposited = []
+    deposit = solver._deposit
+    solver._deposit = lambda cities_from, cities_to, amounts: (deposited.extend(zip(cities_from.tolist(), cities_to.tolist())),
+                                                               deposit(cities_from, cities_to, amounts))
+    solver._colony_seed = 1
+    if synchronous:
+        solver._build_ants_synchronously(0)
+    else:
+        solver._build_ants()
+    routes = [ant.current_route for ant in solver.ants]
+    assert sorted(deposited) == _get_edges(routes)
+    assert solver.route_length == min(ant.current_route_length for ant in solver.ants)
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_mmas_pheromones_stay_within_limits(test_data, sparse: bool) -> None:
+    solver = MMASSolver(test_data.cities, test_data.capacity, 10 ** 9, test_data.truck_count, 1, 10, 1, 7, 20, 0.4, 5,
+                        candidate_list_size=10, sparse=sparse)
+    solver.solve()
+    pheromones = solver.pheromones[solver._off_diagonal]
+    assert solver.tau_max < numpy.inf
+    assert pheromones.min() >= solver.tau_min and pheromones.max() <= solver.tau_max
+    assert numpy.allclose(solver._choice_info, solver.pheromones ** solver.alpha * solver._weighted_heuristic)
+
+def test_estimate_of_initial_pheromones_counts_towards_time_limit(test_data) -> None:
+    solver = EnhancedACOSolver(test_data.cities, test_data.capacity, 10 ** 9, test_data.truck_count, 1, 10, 1, 7, 20, 0.4, 100,
+                               time_limit=0.05, initial_pheromones='savings')
+    estimate = solver._estimate_initial_pheromones
+    solver._estimate_initial_pheromones = lambda: (time.sleep(0.1), estimate())[1]
+    solver.solve()
+    assert solver.stop_reason == 'time'
+    assert solver.solve_time >= 100
+    assert not solver.result
+
+def test_phases_measured_by_workers_are_merged(test_data) -> None:
+    solver = ACOSolver(test_data.cities, test_data.capacity, 10 ** 9, test_data.truck_count, 1, 10, 1, 7, 20, 0.4, 2,
+                       synchronous=True, number_of_workers=2, instrumentation=True)
+    solver.solve()
+    statistics = solver.get_statistics()
+    assert statistics['calls']['construction'] == 20
+    assert statistics['times']['construction'] >= statistics['times']['target_selection'] > 0
+
+SOLVERS = [ACOSolver, EnhancedACOSolver, MMASSolver]
+
+def _solve(test_data, solver_class: type, **kwargs) -> tuple[list[int], float]:
+    solver = solver_class(test_data.cities, test_data.capacity, 300, test_data.truck_count, 7, 10, 1, 7, 20, 0.4, 3, **kwargs)
+    solver.solve()
+    return (solver.route, solver.route_length)
+
+@pytest.mark.parametrize('solver_class', SOLVERS)
+def test_synchronous_result_does_not_depend_on_number_of_workers(test_data, solver_class: type) -> None:
+    results = [_solve(test_data, solver_class, synchronous=True, number_of_workers=workers) for workers in (1, 2, 4)]
+    assert results[0][1] > 0
+    assert results[1] == results[0] and results[2] == results[0]
+
+@pytest.mark.parametrize('solver_class', SOLVERS)
+@pytest.mark.parametrize('options', [{}, {'candidate_list_size': 10}, {'candidate_list_size': 10, 'sparse': True},
+                                     {'synchronous': True, 'number_of_workers': 1}, {'construction': 'giant_tour'}])
+def test_engines_give_the_same_routes(test_data, solver_class: type, options: dict) -> None:
+    (python_result, numpy_result) = (_solve(test_data, solver_class, engine=engine, **options) for engine in ENGINES)
+    assert python_result[1] > 0
+    assert python_result == numpy_result
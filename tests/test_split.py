@@ -0,0 +1,50 @@
+"""Tests of the split decoder against a brute force dynamic programme over all trips"""
+import numpy
+import pytest
+from split import SplitDecoder
+
+def _get_instance(seed: int) -> tuple[numpy.ndarray, numpy.ndarray, int, float, int, numpy.ndarray]:
+    generator = numpy.random.default_rng(seed)
+    size = int(generator.integers(1, 12))
+    positions = generator.uniform(0, 100, (size + 1, 2))
+    distances = numpy.hypot(*(positions[:, numpy.newaxis] - positions[numpy.newaxis]).transpose(2, 0, 1))
+    demands = numpy.concatenate(([0], generator.integers(1, 10, size)))
+    max_capacity = int(generator.integers(9, 30))
+    max_range = float(generator.uniform(150, 400))
+    number_of_trucks = int(generator.integers(1, 6))
+    tour = generator.permutation(numpy.arange(1, size + 1))
+    return (distances, demands, max_capacity, max_range, number_of_trucks, tour)
+
+def _split_brute_force(tour: numpy.ndarray, distances: numpy.ndarray, demands: numpy.ndarray, max_capacity: int,
+                       max_range: float, number_of_trucks: int) -> float:
+    # Shortest split with at most k trucks of the first j customers, O(n^2 K) trips, every one evaluated from scratch
+    size = len(tour)
+    costs = [[numpy.inf] * (size + 1) for _ in range(number_of_trucks + 1)]
+    costs[0][0] = 0.0
+    for trucks in range(1, number_of_trucks + 1):
+        for end in range(1, size + 1):
+            for start in range(end):
+                trip = [0] + tour[start:end].tolist() + [0]
+                length = distances[trip[:-1], trip[1:]].sum()
+                if demands[tour[start:end]].sum() <= max_capacity and length <= max_range:
+                    costs[trucks][end] = min(costs[trucks][end], costs[trucks - 1][start] + length)
+    return min(costs[trucks][size] for trucks in range(number_of_trucks + 1))
+
+@pytest.mark.parametrize('seed', range(400))
+@pytest.mark.parametrize('bounded', [True, False])
+def test_split_is_shortest(seed: int, bounded: bool) -> None:
+    (distances, demands, max_capacity, max_range, number_of_trucks, tour) = _get_instance(seed)
+    decoder = SplitDecoder(distances, demands, max_capacity, max_range, number_of_trucks if bounded else None)
+    (route, route_length) = decoder.split(tour)
+    expected = _split_brute_force(tour, distances, demands, max_capacity, max_range, number_of_trucks if bounded else len(tour))
+    if expected == numpy.inf:
+        assert (route, route_length) == ([], -1)
+        return
+    assert route_length == pytest.approx(expected, abs=1e-9)
+    assert route[0] == route[-1] == 0
+    assert [city for city in route if city != 0] == tour.tolist()
+    assert not bounded or route.count(0) - 1 <= number_of_trucks
+
+def test_empty_tour_gives_empty_route() -> None:
+    decoder = SplitDecoder(numpy.zeros((3, 3)), numpy.array([0, 1, 1]), 1, 1, 1)
+    assert decoder.split([]) == ([0, 0], 0.0)
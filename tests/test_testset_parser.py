@@ -0,0 +1,63 @@
+"""Tests of parsing TSPLIB/CVRPLIB test files and of their cache"""
+import os
+import numpy
+import pytest
+from testset_parser import CACHE_DIRECTORY_NAME, CVRPTestParser
+
+DISTANCES = numpy.array([[0, 3, 5, 7, 2],
+                         [3, 0, 4, 6, 8],
+                         [5, 4, 0, 9, 1],
+                         [7, 6, 9, 0, 5],
+                         [2, 8, 1, 5, 0]])
+
+def _get_weights(edge_weight_format: str) -> list[int]:
+    size = len(DISTANCES)
+    if edge_weight_format == 'FULL_MATRIX':
+        return DISTANCES.ravel().tolist()
+    (lower, diagonal) = (edge_weight_format.startswith('LOWER'), '_DIAG_' in edge_weight_format)
+    weights = []
+    for outer in range(size):
+        # Row formats list the triangle row by row, column formats list it column by column
+        if edge_weight_format.endswith('ROW'):
+            weights.extend(DISTANCES[outer, inner] for inner in (range(outer + 1) if lower else range(outer, size)) if diagonal or inner != outer)
+        else:
+            weights.extend(DISTANCES[inner, outer] for inner in (range(outer, size) if lower else range(outer + 1)) if diagonal or inner != outer)
+    return weights
+
+def _write_test(directory: str, name: str, edge_weight_format: str, solution: bool = True) -> str:
+    weights = _get_weights(edge_weight_format)
+    lines = [F'NAME : {name}', 'COMMENT : (test, No of trucks: 2, Optimal value: 18)', 'TYPE : CVRP', F'DIMENSION : {len(DISTANCES)}',
+             'EDGE_WEIGHT_TYPE : EXPLICIT', F'EDGE_WEIGHT_FORMAT : {edge_weight_format}', 'CAPACITY : 10', 'EDGE_WEIGHT_SECTION']
+    # Weights are wrapped in lines of arbitrary length, as in CVRPLIB files
+    lines += [' '.join(str(weight) for weight in weights[start:start + 3]) for start in range(0, len(weights), 3)]
+    lines += ['DEMAND_SECTION'] + [F'{node} {0 if node == 1 else 4}' for node in range(1, len(DISTANCES) + 1)]
+    lines += ['DEPOT_SECTION', '1', '-1', 'EOF']
+    path = os.path.join(directory, name)
+    with open(path + '.vrp', 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+    if solution:
+        with open(path + '.sol', 'w', encoding='utf-8') as file:
+            file.write('Route #1: 1 2\nRoute #2: 3 4\nCost 18\n')
+    return path
+
+@pytest.mark.parametrize('edge_weight_format', ['FULL_MATRIX', 'LOWER_ROW', 'UPPER_ROW', 'LOWER_DIAG_ROW', 'UPPER_DIAG_ROW',
+                                                'LOWER_COL', 'UPPER_COL', 'LOWER_DIAG_COL', 'UPPER_DIAG_COL'])
+def test_explicit_distances_are_parsed(tmp_path, edge_weight_format: str) -> None:
+    path = _write_test(str(tmp_path), 'E-n5-k2', edge_weight_format)
+    test_data = CVRPTestParser.parse(path, use_cache=False)
+    assert numpy.array_equal(test_data.cities.get_distances(), DISTANCES)
+    assert test_data.cities.demands.tolist() == [0, 4, 4, 4, 4]
+    assert (test_data.truck_count, test_data.capacity, test_data.optimal) == (2, 10, 18)
+    assert test_data.solution == [[1, 2], [3, 4]]
+
+def test_cached_instance_equals_parsed_one(tmp_path) -> None:
+    path = _write_test(str(tmp_path), 'E-n5-k2', 'LOWER_ROW', solution=False)
+    parsed = CVRPTestParser.parse(path, use_cache=False)
+    for _ in range(2):
+        cached = CVRPTestParser.parse(path)
+        assert numpy.array_equal(cached.cities.get_distances(), parsed.cities.get_distances())
+        assert numpy.array_equal(cached.cities.demands, parsed.cities.demands)
+        assert (cached.truck_count, cached.capacity, cached.optimal, cached.solution) == (2, 10, None, [])
+    cache_directory = os.path.join(str(tmp_path), CACHE_DIRECTORY_NAME)
+    (cache_path,) = os.listdir(cache_directory)
+    assert os.stat(os.path.join(cache_directory, cache_path)).st_mode & 0o777 == os.stat(cache_directory).st_mode & 0o777